@@ -5,6 +5,11 @@ import sys
 import random
 import math
 
+from bezier import BezierPath
+from ecs import World
+from projectiles import ProjectilePool
+from timers import TimerHeap
+
 PLAYER_LIVES = 3
 SCREEN_WIDTH = 900
 SCREEN_HEIGHT = 720
@@ -22,70 +27,115 @@ def show_game_over(score, round_number):
     root.destroy()
     sys.exit()
 
-def create_wave(round_num):
-    return spawn_enemies(round_num)
+def create_wave(round_num, timers, player):
+    return spawn_enemies(round_num, timers, player)
+
+# --- Components ---
+# Each enemy builds its components when it is created, and start_game()
+# files them in a World (see ecs.py). The systems in the game loop then
+# only visit the enemies that have the component they work on:
+#   movement  - Movement, the enemy's per-frame update
+#   shooter   - Shooter, fires when its cooldown (on the game's timers) is up
+#   health    - Health, enemies without one die to the first hit
+#   formation - tag for enemies that slide and drop with the formation
+#   diver     - tag for enemies that can be picked to dive at the player
+# A new enemy type only has to build its own components.
+COMPONENTS = ("movement", "shooter", "health", "formation", "diver")
+TAG = True  # Value of tag components, which carry no data
+
+class Movement:
+    def __init__(self, update):
+        self.update = update
+
+class Health:
+    def __init__(self, hp):
+        self.hp = hp
+
+    # Returns whether that hit was fatal
+    def hit(self):
+        self.hp -= 1
+        return self.hp <= 0
+
+class Shooter:
+    def __init__(self, entity, timers, cooldown, shots, not_before=0):
+        self.entity = entity
+        self.timers = timers  # The game's TimerHeap, wakes entity when it can fire
+        self.cooldown = cooldown
+        self.shots = shots  # (x offset, x speed) of each bullet fired
+        self.last_shot_time = timers.now - random.randint(0, cooldown)
+        self.not_before = not_before
+
+    def schedule(self):
+        timers = self.timers
+        timers.schedule(self.entity, max(self.last_shot_time + self.cooldown, self.not_before, timers.now))
+
+    def fire(self, bullets):
+        rect = self.entity.rect
+        for offset, dx in self.shots:
+            bullets.spawn(rect.centerx + offset, rect.bottom, dx, 6, ENEMY_BULLET_COLOR)
+        self.last_shot_time = self.timers.now
+        self.schedule()
 
 class Asteroid:
     def __init__(self, start_x, start_y):
         self.rect = pygame.Rect(start_x, start_y, ENEMY_WIDTH, ENEMY_HEIGHT)
         self.color = (105, 105, 105)  #dark-grey
-        self.hp = 2
+        self.points = 10
+        self.health = Health(2)
         self.speed = random.uniform(0.5, 1.5)
         self.power_up_drop_chance = 0.1
         self.in_formation = False
         self.returning = False
+        self.components = {"movement": Movement(self.update), "health": self.health}
 
     def update(self):
         self.rect.y += self.speed
         if self.rect.top > SCREEN_HEIGHT:
             self.rect.x = random.randint(0, SCREEN_WIDTH - ENEMY_WIDTH)
             self.rect.y = -ENEMY_HEIGHT
-            self.hp = 2
-
-    def take_hit(self):
-        self.hp -= 1
-        return self.hp <= 0
+            self.health.hp = 2
 
     def try_drop_power_up(self):
         return random.random() < self.power_up_drop_chance
 
+# timers is the game's TimerHeap (game time, shot cooldowns) and player the
+# player's rect, both made by start_game() and handed down by spawn_enemies()
 class Enemy:
-    def __init__(self, start_x, start_y, target_x, target_y, enemy_type):
+    shooter = None  # Shooter component, for enemies that shoot
+    direction = None  # Sideways heading, for enemies that patrol
+    vertical_speed = None
+
+    def __init__(self, start_x, start_y, target_x, target_y, enemy_type, timers, player):
+        self.timers = timers
+        self.player = player
         self.rect = pygame.Rect(start_x, start_y, ENEMY_WIDTH, ENEMY_HEIGHT)
         self.color = enemy_type["color"]
         self.points = enemy_type["points"]
-        self.in_formation = False
+        self._in_formation = False
         self.returning = False
         self.path = self.generate_entry_path((start_x, start_y), (target_x, target_y))
         self.path_index = 0
         self.target_pos = (target_x, target_y)
-        self.shoot_cooldown = 2500 
-        self.last_shot_time = 0
 
         self.attack_delay = random.randint(0, 2000)
-        self.spawn_time = pygame.time.get_ticks()
+        self.spawn_time = self.timers.now
+
+    @property
+    def in_formation(self):
+        return self._in_formation
 
-    def generate_entry_path(self, start, end):
+    # Enemies only shoot from the formation, so joining it is what schedules
+    # the next shot
+    @in_formation.setter
+    def in_formation(self, value):
+        if value and not self._in_formation and self.shooter is not None:
+            self.shooter.schedule()
+        self._in_formation = value
+
+    def generate_entry_path(self, start, end, stride=1):
         control1 = (random.randint(50, SCREEN_WIDTH - 50), random.randint(100, 250))
         control2 = (random.randint(50, SCREEN_WIDTH - 50), random.randint(250, 400))
-        steps = 100
-        path = []
-        for t in range(steps + 1):
-            t /= steps
-            x = (
-                (1 - t) ** 3 * start[0]
-                + 3 * (1 - t) ** 2 * t * control1[0]
-                + 3 * (1 - t) * t ** 2 * control2[0]
-                + t ** 3 * end[0]
-            )
-            y = (
-                (1 - t) ** 3 * start[1]
-                + 3 * (1 - t) ** 2 * t * control1[1]
-                + 3 * (1 - t) * t ** 2 * control2[1]
-                + t ** 3 * end[1]
-            )
-            path.append((x, y))
-        return path
+        return BezierPath(start, control1, control2, end, stride=stride)
 
     def update_dive(self):
         pass
@@ -100,19 +150,19 @@ class Enemy:
 
     def bounce_on_edges(self):
         if self.rect.left <= 0 or self.rect.right >= SCREEN_WIDTH:
-            if hasattr(self, "direction"):
+            if self.direction is not None:
                 self.direction *= -1
                 self.rect.x = clamp(self.rect.x, 0, SCREEN_WIDTH - ENEMY_WIDTH)
 
         if self.rect.top <= 0:
-            if hasattr(self, "vertical_speed"):
+            if self.vertical_speed is not None:
                 self.vertical_speed *= -1
             else:
                 self.rect.y = 1
 
 class RedEnemy(Enemy):
-    def __init__(self, sx, sy, tx, ty, round_num):
-        super().__init__(sx, sy, tx, ty, {"color": (255, 0, 0), "points": 20})
+    def __init__(self, sx, sy, tx, ty, round_num, timers, player):
+        super().__init__(sx, sy, tx, ty, {"color": (255, 0, 0), "points": 20}, timers, player)
         self.charging_up = False
         self.charge_path = []
         self.charge_index = 0
@@ -120,13 +170,22 @@ class RedEnemy(Enemy):
         base_speed = 1.5 + 0.04 * round_num
         self.speed = random.uniform(max(0.3, base_speed - 0.2), base_speed + 0.3)
 
-        self.shoot_cooldown = 5000
-        self.last_shot_time = pygame.time.get_ticks() - random.randint(0, self.shoot_cooldown)
+        # Red enemies also hold fire until attack_delay after spawning
+        self.shooter = Shooter(self, timers, 5000, ((-2, 0),), self.spawn_time + self.attack_delay)
 
         self.zigzag = random.choice([True, False])
         self.zigzag_amplitude = 15
         self.zigzag_frequency = 0.08
         self.zigzag_phase = random.uniform(0, 2 * math.pi)
+        self.pos_x = None  # Float position once diving
+        self.pos_y = None
+
+        self.components = {
+            "movement": Movement(self.update),
+            "shooter": self.shooter,
+            "formation": TAG,
+            "diver": TAG,
+        }
 
     def update(self):
         if not self.in_formation and not self.returning:
@@ -149,7 +208,7 @@ class RedEnemy(Enemy):
         if self.charging_up:
             if self.charge_index < len(self.charge_path):
                 self.rect.x, self.rect.y = map(int, self.charge_path[self.charge_index])
-                self.charge_index += 2
+                self.charge_index += 1
             else:
                 self.return_to_formation()
                 self.charging_up = False
@@ -167,7 +226,8 @@ class RedEnemy(Enemy):
             self.charging_up = True
             self.charge_path = self.generate_entry_path(
                 (self.rect.x, self.rect.y),
-                (self.target_pos[0], self.target_pos[1] + 30)
+                (self.target_pos[0], self.target_pos[1] + 30),
+                stride=2
             )
             self.charge_index = 0
 
@@ -175,13 +235,13 @@ class RedEnemy(Enemy):
         if self.charging_up:
             if self.charge_index < len(self.charge_path):
                 self.rect.x, self.rect.y = map(int, self.charge_path[self.charge_index])
-                self.charge_index += 2
+                self.charge_index += 1
             else:
                 self.return_to_formation()
                 self.charging_up = False
             return
 
-        if not hasattr(self, 'pos_x'):
+        if self.pos_x is None:
             self.pos_x = float(self.rect.x)
             self.pos_y = float(self.rect.y)
 
@@ -201,7 +261,8 @@ class RedEnemy(Enemy):
             self.charging_up = True
             self.charge_path = self.generate_entry_path(
                 (self.rect.x, self.rect.y),
-                (self.target_pos[0], self.target_pos[1] + 30)
+                (self.target_pos[0], self.target_pos[1] + 30),
+                stride=2
             )
             self.charge_index = 0
 
@@ -212,30 +273,28 @@ class RedEnemy(Enemy):
         else:
             self.in_formation = True
 
-    def shoot(self, bullets):
-        current_time = pygame.time.get_ticks()
-        if current_time - self.spawn_time >= self.attack_delay:
-            if self.in_formation and (current_time - self.last_shot_time) >= self.shoot_cooldown:
-                bullet = pygame.Rect(self.rect.centerx - 2, self.rect.bottom, 4, 12)
-                bullets.append((bullet, (0, 6), ENEMY_BULLET_COLOR))
-                self.last_shot_time = current_time
-
 class GreenEnemy(Enemy):
-    def __init__(self, sx, sy, tx, ty, round_num, pattern_type):
-        super().__init__(sx, sy, tx, ty, {"color": (0, 255, 0), "points": 35})
-        self.hp = 2
+    def __init__(self, sx, sy, tx, ty, round_num, timers, player, pattern_type):
+        super().__init__(sx, sy, tx, ty, {"color": (0, 255, 0), "points": 35}, timers, player)
         self.speed = min(1 + 0.03 * round_num, 1.8)
         self.center = (tx, ty)
         self.pattern_type = pattern_type
         self.pattern_points = self.generate_pattern_points(pattern_type, round_num)
         self.pattern_index = random.randint(0, len(self.pattern_points) - 1)
-        self.shoot_cooldown = 4000
-        self.last_shot_time = pygame.time.get_ticks() - random.randint(0, self.shoot_cooldown)
+        self.shooter = Shooter(self, timers, 4000, ((-4, -3), (4, 3)))
         self.phase_angle = 0
         self.phase_speed = 0.05
         self.direction = 1
         self.radius = 40 + round_num * 5
 
+        # Green enemies keep to their own pattern instead of the formation
+        self.components = {
+            "movement": Movement(self.update),
+            "shooter": self.shooter,
+            "health": Health(2),
+            "diver": TAG,
+        }
+
     def update(self):
         if not self.in_formation and not self.returning:
             if self.path_index < len(self.path):
@@ -376,32 +435,23 @@ class GreenEnemy(Enemy):
                     self.pattern_index = closest_index
                     self.rect.center = (int(self.pattern_points[closest_index][0]), int(self.pattern_points[closest_index][1]))
 
-    def shoot(self, bullets):
-        current_time = pygame.time.get_ticks()
-        if self.in_formation and (current_time - self.last_shot_time) >= self.shoot_cooldown:
-            left_bullet = pygame.Rect(self.rect.centerx - 4, self.rect.bottom, 4, 12)
-            right_bullet = pygame.Rect(self.rect.centerx + 4, self.rect.bottom, 4, 12)
-            bullets.append((left_bullet, (-3, 6), ENEMY_BULLET_COLOR))
-            bullets.append((right_bullet, (3, 6), ENEMY_BULLET_COLOR))
-            self.last_shot_time = current_time
-
-    def take_hit(self):
-        self.hp -= 1
-        return self.hp <= 0
-
 class PurpleEnemy(Enemy):
-    def __init__(self, sx, sy, tx, ty, round_num, direction=1):
-        super().__init__(sx, sy, tx, ty, {"color": (128, 0, 255), "points": 30})
+    def __init__(self, sx, sy, tx, ty, round_num, timers, player, direction=1):
+        super().__init__(sx, sy, tx, ty, {"color": (128, 0, 255), "points": 30}, timers, player)
         self.speed = min(1 + 0.04 * round_num, 2.0)
         self.phase_angle = 0
         self.radius = 40
         self.center = (tx, ty)
         self.phase_speed = 0.05 * self.speed
-        self.shoot_cooldown = 2500
-        self.last_shot_time = pygame.time.get_ticks() - random.randint(0, self.shoot_cooldown)
         self.direction = direction
         self.zigzag_phase = random.uniform(0, 2 * math.pi)
-        self.player_ref = None
+        self.base_y = None  # Height it zigzags around once in formation
+
+        self.components = {
+            "movement": Movement(self.update),
+            "formation": TAG,
+            "diver": TAG,
+        }
 
     def update(self):
         if not self.in_formation and not self.returning:
@@ -423,14 +473,13 @@ class PurpleEnemy(Enemy):
                 self.returning = False
             return
 
-        if not hasattr(self, 'base_y'):
+        if self.base_y is None:
             self.base_y = self.rect.y
 
         self.rect.x += int(self.speed * self.direction)
 
         if self.rect.left <= 0 or self.rect.right >= SCREEN_WIDTH:
-            if hasattr(self, 'player_ref'):
-                self.start_dive(self.player_ref.centerx, self.player_ref.centery)
+            self.start_dive(self.player.centerx, self.player.centery)
             return
 
         zigzag_amplitude = 30
@@ -463,13 +512,13 @@ class PurpleEnemy(Enemy):
 
     def update_dive(self):
         if self.in_formation:
-            if not hasattr(self, 'base_y'):
+            if self.base_y is None:
                 self.base_y = self.rect.y
 
             self.rect.x += int(self.speed * self.direction)
 
             if self.rect.left <= 0 or self.rect.right >= SCREEN_WIDTH:
-                self.start_dive(self.player_ref.centerx, self.player_ref.centery)
+                self.start_dive(self.player.centerx, self.player.centery)
                 return
 
             zigzag_amplitude = 30
@@ -477,39 +526,51 @@ class PurpleEnemy(Enemy):
             offset = int(zigzag_amplitude * math.sin(zigzag_frequency * self.rect.x + self.zigzag_phase))
             self.rect.y = self.base_y + offset
 
-    def take_hit(self):
-        self.hp -= 1
-        return self.hp <= 0
-
+# enemy_bullets is a ProjectilePool, see projectiles.py
 def update_enemy_bullets(enemy_bullets):
-    for bullet in enemy_bullets[:]:
-        rect, (dx, dy), _ = bullet
-        rect.x += dx
-        rect.y += dy
-        if rect.top > SCREEN_HEIGHT:
-            enemy_bullets.remove(bullet)
+    enemy_bullets.update(SCREEN_HEIGHT)
 
 def draw_enemy_bullets(screen, enemy_bullets):
-    for rect, _, color in enemy_bullets:
-        pygame.draw.rect(screen, color, rect)
+    for x, y, w, h, color in enemy_bullets:
+        pygame.draw.rect(screen, color, (x, y, w, h))
 
 def check_bullet_player_collisions(player, enemy_bullets):
-    for bullet in enemy_bullets[:]:
-        rect, _, _ = bullet
-        if rect.colliderect(player):
-            enemy_bullets.remove(bullet)
-            return True
-    return False
-
-def handle_enemy_shooting(enemies, enemy_bullets, current_time):
+    index = enemy_bullets.first_hit(player)
+    if index is None:
+        return False
+    enemy_bullets.remove(index)
+    return True
+
+# Only enemies whose cooldown is up are woken. One that has left the
+# formation since is skipped and gets rescheduled when it rejoins.
+def handle_enemy_shooting(timers, shooters, enemy_bullets):
+    for enemy in timers.pop_due():
+        if enemy.in_formation:
+            shooters[enemy].fire(enemy_bullets)
+
+# Each bullet hits at most one enemy. Enemies without a Health component die
+# to the first hit, the rest once it runs out. Returns the points scored.
+def handle_bullet_hits(bullets, enemies, world, timers):
+    healths = world["health"]
+    points = 0
+    for bullet in bullets[:]:
+        for e in enemies[:]:
+            if bullet.colliderect(e.rect):
+                bullets.remove(bullet)
+                health = healths.get(e)
+                if health is None or health.hit():
+                    enemies.remove(e)
+                    world.remove(e)
+                    timers.cancel(e)
+                    points += e.points
+                break
+    return points
+
+def add_enemies(world, enemies):
     for enemy in enemies:
-        if hasattr(enemy, "shoot"):
-            try:
-                enemy.shoot(enemy_bullets, current_time)
-            except TypeError:
-                enemy.shoot(enemy_bullets)
+        world.add(enemy, enemy.components)
 
-def spawn_enemies(round_num):
+def spawn_enemies(round_num, timers, player):
     enemies = []
     cols = 8
     rows = 4
@@ -548,14 +609,14 @@ def spawn_enemies(round_num):
                     if row == 2:
                         red_positions = [1, 3, 5, 7]
                         if col in red_positions:
-                            enemy = RedEnemy(sx, sy, tx, ty, round_num)
+                            enemy = RedEnemy(sx, sy, tx, ty, round_num, timers, player)
                         else:
                             break
                     elif row == 0:
-                        enemy = RedEnemy(sx, sy, tx, ty, round_num)
+                        enemy = RedEnemy(sx, sy, tx, ty, round_num, timers, player)
                     elif row == 1:
                         direction = -1 if purple_toggle else 1
-                        enemy = PurpleEnemy(sx, sy, tx, ty, round_num, direction)
+                        enemy = PurpleEnemy(sx, sy, tx, ty, round_num, timers, player, direction)
                         purple_toggle = not purple_toggle
                     else:
                         if green_count < len(green_patterns):
@@ -563,7 +624,7 @@ def spawn_enemies(round_num):
                             green_count += 1
                         else:
                             pattern = random.choice(green_patterns)
-                        enemy = GreenEnemy(sx, sy, tx, ty, round_num, pattern)
+                        enemy = GreenEnemy(sx, sy, tx, ty, round_num, timers, player, pattern)
 
                     enemies.append(enemy)
                     placed_rects.append(pygame.Rect(tx, ty, ENEMY_WIDTH, ENEMY_HEIGHT))
@@ -585,7 +646,7 @@ def start_game():
     player = pygame.Rect(SCREEN_WIDTH // 2 - 20, SCREEN_HEIGHT - 70, 40, 40)
     player_speed = 6
     bullets = []
-    enemy_bullets = []
+    enemy_bullets = ProjectilePool()
     bullet_speed = 10
     shoot_cooldown = 500
     last_shot_time = pygame.time.get_ticks()
@@ -594,8 +655,15 @@ def start_game():
     item_ready = True
     force_field_ready = True
 
+    timers = TimerHeap()  # Game time for shot cooldowns, advanced by the frame clock
+    world = World(*COMPONENTS)
+    movers = world["movement"]
+    shooters = world["shooter"]
+    formation_members = world["formation"]
+    divers = world["diver"]
     round_number = 1
-    enemies = spawn_enemies(round_number)
+    enemies = spawn_enemies(round_number, timers, player)
+    add_enemies(world, enemies)
     formation_direction = 1
     formation_speed = 1.5
 
@@ -651,7 +719,7 @@ def start_game():
         else:
             player_visible = True
 
-        handle_enemy_shooting(enemies, enemy_bullets, current_time)
+        handle_enemy_shooting(timers, shooters, enemy_bullets)
         update_enemy_bullets(enemy_bullets)
         draw_enemy_bullets(screen, enemy_bullets)
 
@@ -683,11 +751,8 @@ def start_game():
             if bullet.bottom < 0:
                 bullets.remove(bullet)
 
-        for enemy in enemies:
-            if isinstance(enemy, PurpleEnemy):
-                enemy.player_ref = player
-
-            enemy.update()
+        for movement in movers.values():
+            movement.update()
 
         in_formation_enemies = [e for e in enemies if e.in_formation]
         if in_formation_enemies:
@@ -695,16 +760,16 @@ def start_game():
             right = max(e.rect.right for e in in_formation_enemies)
             if right + formation_speed * formation_direction > SCREEN_WIDTH or left + formation_speed * formation_direction < 0:
                 formation_direction *= -1
-                for e in in_formation_enemies:
-                    if not isinstance(e, GreenEnemy):
+                for e in formation_members:
+                    if e.in_formation:
                         e.rect.y += 20 
             else:
-                for e in in_formation_enemies:
-                    if not isinstance(e, GreenEnemy):
+                for e in formation_members:
+                    if e.in_formation:
                         e.rect.x += formation_speed * formation_direction
 
             if len(diving_enemies) < 3:
-                potential_divers = [e for e in in_formation_enemies if random.random() < 0.002]
+                potential_divers = [e for e in in_formation_enemies if e in divers and random.random() < 0.002]
                 for diver in potential_divers:
                     diver.start_dive(player.centerx, player.centery)
                     diving_enemies.append(diver)
@@ -716,18 +781,7 @@ def start_game():
                     diver.return_to_formation()
                     diving_enemies.remove(diver)
 
-            for bullet in bullets[:]:
-                for e in enemies[:]:
-                    if bullet.colliderect(e.rect):
-                        bullets.remove(bullet)
-                        if isinstance(e, GreenEnemy):
-                            if e.take_hit():
-                                enemies.remove(e)
-                                score += e.points
-                        else:
-                            enemies.remove(e)
-                            score += e.points
-                        break
+            score += handle_bullet_hits(bullets, enemies, world, timers)
 
             for e in enemies:
                 if e.rect.colliderect(player):
@@ -744,7 +798,9 @@ def start_game():
 
             if not enemies:
                 round_number += 1
-                enemies = spawn_enemies(round_number)
+                enemies = spawn_enemies(round_number, timers, player)
+                world.clear()
+                add_enemies(world, enemies)
                 formation_speed += 0.2
 
         if player_visible:
@@ -765,7 +821,7 @@ def start_game():
         screen.blit(round_surf, (10, SCREEN_HEIGHT - 60))
 
         pygame.display.flip()
-        clock.tick(60)
+        timers.advance(clock.tick(60))
 
     pygame.quit()
     root = tk.Tk()
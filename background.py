@@ -0,0 +1,52 @@
+import random
+
+import pygame
+
+from game_core import SCREEN_WIDTH, SCREEN_HEIGHT
+
+# Scrolling parallax starfield.
+# Each layer's stars are drawn once into a screen-sized Surface that wraps
+# around vertically. Scrolling is then just a matter of where that Surface
+# goes: two blits per layer (the part below the seam and the part above
+# it) cover the screen whatever the offset, however many stars there are.
+# The back layer is opaque and stands in for the black fill; the layers in
+# front of it are colour-keyed so the ones behind show through. Offsets
+# follow game time, so the stars stop when the game is paused.
+
+BLACK = (0, 0, 0)
+
+# (stars, scroll speed in pixels per ms, star size, colour), back to front
+LAYERS = (
+    (120, 0.01, 1, (90, 90, 110)),
+    (60, 0.03, 1, (170, 170, 190)),
+    (25, 0.06, 2, (255, 255, 255)),
+)
+
+class Starfield:
+    def __init__(self, layers=LAYERS, size=(SCREEN_WIDTH, SCREEN_HEIGHT), seed=None):
+        rng = random.Random(seed)
+        width, height = size
+        self.height = height
+        self.layers = []
+        for n, (stars, speed, star_size, color) in enumerate(layers):
+            surface = pygame.Surface(size)
+            if pygame.display.get_surface() is not None:
+                surface = surface.convert()  # Match the screen's pixel format
+            surface.fill(BLACK)
+            if n:
+                surface.set_colorkey(BLACK, pygame.RLEACCEL)  # Sparse, so run-length blits skip the gaps
+            for _ in range(stars):
+                surface.fill(color, (rng.randrange(width), rng.randrange(height), star_size, star_size))
+            self.layers.append((surface, speed))
+
+    # blits() items that cover the screen with every layer scrolled to
+    # game time (ms)
+    def blits(self, time):
+        height = self.height
+        items = []
+        for surface, speed in self.layers:
+            offset = int(time * speed) % height
+            items.append((surface, (0, offset)))
+            if offset:
+                items.append((surface, (0, offset - height)))
+        return items
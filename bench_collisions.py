@@ -0,0 +1,103 @@
+import random
+import sys
+import time
+
+import pygame
+
+from game_core import ENEMY_WIDTH, ENEMY_HEIGHT, SCREEN_WIDTH, SCREEN_HEIGHT
+from spatial_hash import PlainScan, SpatialHash
+
+# Player-bullet vs enemy collision benchmark.
+# Runs the old bullets x enemies scan, the plain-scan broadphase and the
+# spatial-hash broadphase over the same seeded scenes, checks they hit
+# exactly the same enemies, and prints the time per tick for each enemy
+# count. speedup is the plain scan (the game's default) over the hash, so
+# below 1.0x the hash is the slower of the two.
+# Usage: python bench_collisions.py [ticks] [bullets]
+
+ENEMY_COUNTS = (30, 100, 200, 300, 500, 1000, 2000, 5000)
+
+class Target:
+    def __init__(self, x, y):
+        self.rect = pygame.Rect(x, y, ENEMY_WIDTH, ENEMY_HEIGHT)
+
+# Formation layout like create_wave(), with as many rows as the count needs.
+# Keeps the density of a real wave instead of piling thousands of enemies
+# on top of each other.
+COLS = SCREEN_WIDTH // (ENEMY_WIDTH + 20)
+
+def make_enemies(count, seed):
+    rng = random.Random(seed)
+    spacing = ENEMY_WIDTH + 20
+    return [
+        Target(n % COLS * spacing + rng.randint(0, 15), 80 + n // COLS * spacing + rng.randint(0, 15))
+        for n in range(count)
+    ]
+
+def make_bullets(rng, count, field_height):
+    return [pygame.Rect(rng.randint(0, SCREEN_WIDTH), rng.randint(0, field_height), 5, 15) for _ in range(count)]
+
+# Same shape as the loop start_game() used to run
+def scan_hits(bullets, enemies, grid):
+    hits = []
+    for bullet in bullets[:]:
+        for e in enemies[:]:
+            if bullet.colliderect(e.rect):
+                bullets.remove(bullet)
+                enemies.remove(e)
+                hits.append(e)
+                break
+    return hits, enemies
+
+def hash_hits(bullets, enemies, grid):
+    hits = []
+    dead = set()
+    grid.sync(enemies)
+    for bullet in bullets:
+        e = grid.first_hit(bullet)
+        if e is not None:
+            grid.remove(e)
+            dead.add(e)
+            hits.append(e)
+    if dead:
+        enemies = [e for e in enemies if e not in dead]
+    return hits, enemies
+
+def run(resolve, count, ticks, bullet_count, grid, seed=1):
+    enemies = make_enemies(count, seed)
+    index = {e: n for n, e in enumerate(enemies)}
+    rng = random.Random(seed + 1)
+    field_height = max(SCREEN_HEIGHT, 80 + (count // COLS + 1) * (ENEMY_WIDTH + 20))
+    hits = []
+    elapsed = 0
+    direction = 1
+    for _ in range(ticks):
+        # Slide everything like the formation does, so the grid has to keep up
+        direction = -direction if rng.random() < 0.02 else direction
+        for e in enemies:
+            e.rect.x += 2 * direction
+        bullets = make_bullets(rng, bullet_count, field_height)
+        started = time.perf_counter_ns()
+        tick_hits, enemies = resolve(bullets, enemies, grid)
+        elapsed += time.perf_counter_ns() - started
+        hits.extend(index[e] for e in tick_hits)
+    return elapsed / ticks / 1000, hits
+
+def main():
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    bullet_count = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    print(f"{ticks} ticks, {bullet_count} bullets per tick")
+    print(f"{'enemies':>8} {'scan us':>10} {'plain us':>10} {'hash us':>10} {'speedup':>8} {'hits':>6}")
+    for count in ENEMY_COUNTS:
+        scan_us, scan_result = run(scan_hits, count, ticks, bullet_count, None)
+        plain_us, plain_result = run(hash_hits, count, ticks, bullet_count, PlainScan())
+        hash_us, hash_result = run(hash_hits, count, ticks, bullet_count, SpatialHash(ENEMY_WIDTH))
+        if not scan_result == plain_result == hash_result:
+            raise SystemExit(f"Hit mismatch with {count} enemies")
+        print(
+            f"{count:>8} {scan_us:>10.1f} {plain_us:>10.1f} {hash_us:>10.1f}"
+            f" {plain_us / hash_us:>7.1f}x {len(hash_result):>6}"
+        )
+
+if __name__ == "__main__":
+    main()
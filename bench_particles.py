@@ -0,0 +1,66 @@
+import argparse
+import os
+import statistics
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_RENDER_DRIVER", "software")
+
+import pygame
+
+from game_core import FRAME_MS, GameState, sweep_inputs
+from particles import MAX_PARTICLES
+from renderer import open_renderer
+
+# Particle stress benchmark.
+# Plays a seeded game headlessly and keeps the renderer's particle pool
+# topped up to the budget with fresh bursts every frame, so the pool is
+# always full while particles keep burning out and being replaced. Times
+# the renderer's whole frame (particle update and draw included) and checks
+# it against the 60 fps budget.
+# Usage: python bench_particles.py [--frames N] [--particles N] [--backend surface|texture]
+
+BURST = 200  # Particles per top-up burst
+
+def run(frames, particles, backend, seed=1):
+    pygame.init()
+    renderer = open_renderer(backend, "Particle benchmark", pygame.font.Font(None, 30))
+    pool = renderer.particles
+    state = GameState(seed=seed)
+    times = []
+    live = []
+    for n in range(frames):
+        state.step(sweep_inputs(n))
+        frame = state.snapshot()
+        started = time.perf_counter_ns()
+        # Topped up after the pool's own update would run, so the draw sees
+        # a full pool
+        renderer._update_particles(frame)
+        x = 50
+        while len(pool) < particles:
+            pool.burst(x, 350, (255, 160, 0), min(BURST, particles - len(pool)))
+            x = x % 700 + 60
+        renderer.draw(frame)
+        renderer.present()
+        times.append((time.perf_counter_ns() - started) / 1e6)
+        live.append(len(pool))
+    pygame.quit()
+    return times, live
+
+def main():
+    parser = argparse.ArgumentParser(description="Particle system stress benchmark.")
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--particles", type=int, default=MAX_PARTICLES)
+    parser.add_argument("--backend", choices=("surface", "texture"), default="surface")
+    args = parser.parse_args()
+
+    times, live = run(args.frames, args.particles, args.backend)
+    cuts = statistics.quantiles(times, n=100)
+    over = sum(t > FRAME_MS for t in times)
+    print(f"backend          {args.backend}")
+    print(f"live particles   {min(live)}-{max(live)}")
+    print(f"frame ms         avg {statistics.fmean(times):.2f}  p50 {cuts[49]:.2f}  p99 {cuts[98]:.2f}  max {max(times):.2f}")
+    print(f"over {FRAME_MS:.1f} ms     {over} of {len(times)} frames")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import types
+from pathlib import Path
+
+# Benchmark every version of the game headlessly.
+# Each version runs in its own process with SDL's dummy video driver and a
+# stand-in tkinter, so menus and game-over windows never open. start_game()
+# is then driven with scripted input (the same sweep as the headless driver
+# in game_core, plus a tap on Enter every second for the versions that wait
+# for it to respawn) for a fixed number of frames, starting a new game after
+# each game over. Game time is tied to the frame count, so every version
+# plays the same 60 fps game however fast it runs.
+# Reports ticks/sec, p50/p99 frame time and peak memory, and saves them as
+# JSON. Pass an older results file with --compare to spot regressions.
+# --backend picks the render backend for versions that have a choice
+# (RENDER_BACKEND); "texture" runs on SDL's software renderer here.
+# Versions with a SCALED_DISPLAY switch run unscaled unless --scaled is
+# given: on the dummy driver the SCALED present is pure CPU work that a real
+# display would hand to the GPU.
+# Usage: python bench_versions.py [--frames N] [--seed S] [--out FILE]
+#                                 [--compare OLD_FILE] [--only NAME ...]
+#                                 [--backend surface|texture] [--scaled]
+
+ROOT = Path(__file__).resolve().parent
+FRAME_MS = 1000 / 60
+REGRESSION = 0.10  # Ticks/sec drop that --compare reports as a regression
+
+# Every script in the repo with a start_game() is a version of the game
+def find_versions():
+    return [
+        path.name for path in sorted(ROOT.glob("*.py"))
+        if path.name != Path(__file__).name and "def start_game(" in path.read_text(encoding="utf-8", errors="replace")
+    ]
+
+# --- Child side: runs one version ---
+
+class FramesDone(Exception):
+    pass
+
+def _noop(*args, **kwargs):
+    return None
+
+class StubWidget:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __getattr__(self, name):
+        return _noop
+
+def stub_tkinter():
+    tk = types.ModuleType("tkinter")
+    tk.__getattr__ = lambda name: StubWidget
+    messagebox = types.ModuleType("tkinter.messagebox")
+    messagebox.__getattr__ = lambda name: _noop
+    tk.messagebox = messagebox
+    sys.modules["tkinter"] = tk
+    sys.modules["tkinter.messagebox"] = messagebox
+
+class ScriptedKeys:
+    def __init__(self, pygame, inputs):
+        self.held = {
+            pygame.K_LEFT: inputs.left,
+            pygame.K_RIGHT: inputs.right,
+            pygame.K_UP: inputs.up,
+            pygame.K_DOWN: inputs.down,
+            pygame.K_SPACE: inputs.shoot,
+        }
+
+    def __getitem__(self, key):
+        return self.held.get(key, False)
+
+# Stands in for pygame.time.Clock: never sleeps, records how long each frame
+# took and stops the game once it has run enough frames
+class FrameClock:
+    frame = 0
+    frames = 0
+    times = []
+    last = None
+
+    def __init__(self, *args):
+        pass
+
+    def tick(self, framerate=0):
+        now = time.perf_counter_ns()
+        cls = FrameClock
+        if cls.last is not None:
+            cls.times.append((now - cls.last) / 1e6)
+        cls.last = now
+        cls.frame += 1
+        if cls.frame >= cls.frames:
+            raise FramesDone
+        return FRAME_MS
+
+    def get_fps(self):
+        return 1000 / FRAME_MS
+
+def peak_memory_mb():
+    try:
+        import resource
+    except ImportError:  # Not available on Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+def scripted_events(pygame):
+    if FrameClock.frame % 60 == 0:
+        return [pygame.event.Event(pygame.KEYDOWN, key=pygame.K_RETURN)]
+    return []
+
+def run_version(name, frames, seed, backend, scaled):
+    import importlib.util
+    import pygame
+    from game_core import sweep_inputs
+
+    stub_tkinter()
+    random.seed(seed)
+    FrameClock.frames = frames
+    pygame.time.Clock = FrameClock
+    pygame.time.get_ticks = lambda: int(FrameClock.frame * FRAME_MS)
+    pygame.event.get = lambda *args, **kwargs: scripted_events(pygame)
+    pygame.key.get_pressed = lambda: ScriptedKeys(pygame, sweep_inputs(FrameClock.frame))
+    time.sleep = _noop
+
+    spec = importlib.util.spec_from_file_location("bench_target", ROOT / name)
+    game = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(game)
+    if not hasattr(game, "window"):
+        game.window = StubWidget()  # Normally made by the menu
+    if hasattr(game, "RENDER_BACKEND"):
+        game.RENDER_BACKEND = backend
+    if hasattr(game, "SCALED_DISPLAY"):
+        game.SCALED_DISPLAY = scaled
+    if hasattr(game, "GameState"):
+        state_class = game.GameState
+        game.GameState = lambda: state_class(seed=seed)
+
+    status = "ok"
+    games = 0
+    started = time.perf_counter()
+    while True:
+        games += 1
+        FrameClock.last = None  # Time spent restarting isn't a frame
+        first_frame = FrameClock.frame
+        try:
+            game.start_game()
+        except FramesDone:
+            break
+        except SystemExit:
+            pass
+        except Exception as e:
+            status = f"error: {type(e).__name__}: {e}"
+            break
+        if FrameClock.frame == first_frame:
+            status = "error: game ended without playing a frame"
+            break
+    elapsed = time.perf_counter() - started
+
+    times = FrameClock.times
+    played = FrameClock.frame
+    result = {
+        "status": status,
+        "frames": played,
+        "games": games,
+        "ticks_per_sec": played / elapsed if elapsed else None,
+        "p50_ms": None,
+        "p99_ms": None,
+        "peak_memory_mb": peak_memory_mb(),
+    }
+    if len(times) >= 2:
+        cuts = statistics.quantiles(times, n=100)
+        result["p50_ms"] = cuts[49]
+        result["p99_ms"] = cuts[98]
+    return result
+
+def child(name, frames, seed, backend, scaled):
+    out = sys.stdout
+    sys.stdout = open(os.devnull, "w")  # Games print now and then
+    result = run_version(name, frames, seed, backend, scaled)
+    json.dump(result, out)
+
+# --- Parent side ---
+
+def bench(name, frames, seed, backend, scaled):
+    env = dict(
+        os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy", SDL_RENDER_DRIVER="software",
+        PYGAME_HIDE_SUPPORT_PROMPT="1",
+    )
+    command = [sys.executable, __file__, "--child", name, "--frames", str(frames), "--seed", str(seed), "--backend", backend]
+    if scaled:
+        command.append("--scaled")
+    proc = subprocess.run(command, cwd=ROOT, env=env, capture_output=True, text=True)
+    try:
+        return json.loads(proc.stdout)
+    except ValueError:
+        lines = proc.stderr.strip().splitlines()
+        return {"status": "crashed: " + (lines[-1] if lines else f"exit code {proc.returncode}"), "frames": 0}
+
+def _fmt(value, spec):
+    return format(value, spec) if value is not None else "-"
+
+def print_table(results):
+    print(f"{'version':<32} {'ticks/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'peak MB':>8} {'games':>6}  status")
+    for name, r in results.items():
+        print(
+            f"{name:<32} {_fmt(r.get('ticks_per_sec'), '9.0f')} {_fmt(r.get('p50_ms'), '8.2f')}"
+            f" {_fmt(r.get('p99_ms'), '8.2f')} {_fmt(r.get('peak_memory_mb'), '8.1f')} {_fmt(r.get('games'), '6d')}  {r['status']}"
+        )
+
+# Prints the ticks/sec change per version, returns the names that got slower
+# by more than REGRESSION
+def compare(old, new):
+    regressed = []
+    print(f"\n{'version':<32} {'old t/s':>9} {'new t/s':>9} {'change':>8}")
+    for name, r in new.items():
+        before = old.get(name, {}).get("ticks_per_sec")
+        after = r.get("ticks_per_sec")
+        if not before or not after:
+            continue
+        change = after / before - 1
+        flag = "  REGRESSION" if change < -REGRESSION else ""
+        print(f"{name:<32} {before:>9.0f} {after:>9.0f} {change:>+7.1%}{flag}")
+        if flag:
+            regressed.append(name)
+    return regressed
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every game version headlessly.")
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--compare", metavar="OLD_FILE")
+    parser.add_argument("--only", nargs="+", metavar="NAME", help="only run versions whose file name contains NAME")
+    parser.add_argument("--backend", choices=("surface", "texture"), default="surface")
+    parser.add_argument("--scaled", action="store_true", help="run versions that have the switch with SCALED_DISPLAY on")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.frames, args.seed, args.backend, args.scaled)
+        return
+
+    versions = find_versions()
+    if args.only:
+        versions = [v for v in versions if any(part in v for part in args.only)]
+
+    results = {}
+    for name in versions:
+        print(f"Running {name}...", file=sys.stderr)
+        results[name] = bench(name, args.frames, args.seed, args.backend, args.scaled)
+    print_table(results)
+
+    report = {
+        "frames": args.frames,
+        "seed": args.seed,
+        "backend": args.backend,
+        "scaled": args.scaled,
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSaved to {args.out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            old = json.load(f)
+        if old["frames"] != args.frames:
+            print(f"\nNote: {args.compare} ran {old['frames']} frames, this run {args.frames}")
+        if compare(old["results"], results):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+try:
+    import numpy as np
+except ImportError:  # Only bernstein_array() (for EnemyStore) needs NumPy
+    np = None
+
+# Cubic Bezier helpers for enemy flight paths.
+# The four Bernstein basis polynomials only depend on the step count, so they
+# are worked out once per step count and reused for every path after that.
+
+STEPS = 100
+
+_basis_cache = {}
+_basis_array_cache = {}
+
+def bernstein_table(steps=STEPS):
+    table = _basis_cache.get(steps)
+    if table is None:
+        table = []
+        for t in range(steps + 1):
+            t /= steps
+            table.append((
+                (1 - t) ** 3,
+                3 * (1 - t) ** 2 * t,
+                3 * (1 - t) * t ** 2,
+                t ** 3,
+            ))
+        table = tuple(table)
+        _basis_cache[steps] = table
+    return table
+
+def bernstein_array(steps=STEPS):
+    basis = _basis_array_cache.get(steps)
+    if basis is None:
+        basis = np.array(bernstein_table(steps))
+        _basis_array_cache[steps] = basis
+    return basis
+
+# Lazy path: keeps only the control points and works out a point when it is
+# asked for. Indexes like a list of steps + 1 (x, y) points, so code that
+# reads path[path_index] and checks len(path) keeps working. With stride=n it
+# visits every n-th point of the full path.
+class BezierPath:
+    __slots__ = ("x0", "y0", "x1", "y1", "x2", "y2", "x3", "y3", "steps", "stride", "length")
+
+    def __init__(self, start, control1, control2, end, steps=STEPS, stride=1):
+        self.x0, self.y0 = start
+        self.x1, self.y1 = control1
+        self.x2, self.y2 = control2
+        self.x3, self.y3 = end
+        self.steps = steps
+        self.stride = stride
+        self.length = steps // stride + 1
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("path index out of range")
+        b0, b1, b2, b3 = bernstein_table(self.steps)[index * self.stride]
+        return (
+            b0 * self.x0 + b1 * self.x1 + b2 * self.x2 + b3 * self.x3,
+            b0 * self.y0 + b1 * self.y1 + b2 * self.y2 + b3 * self.y3,
+        )
+
+    def __iter__(self):
+        for index in range(self.length):
+            yield self[index]
+
+    def controls(self):
+        return ((self.x0, self.y0), (self.x1, self.y1), (self.x2, self.y2), (self.x3, self.y3))
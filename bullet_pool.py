@@ -0,0 +1,154 @@
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Fixed-capacity storage for player bullets.
+# Bullets live in preallocated position arrays used as a ring buffer: shots
+# go in at the tail, and since every bullet flies up at the same speed the
+# oldest ones leave the screen first and are dropped from the head. Bullets
+# that hit something are only marked dead in the alive mask. The ring skips
+# over them and reuses the slots once the head passes. Spawn order is never
+# changed, so collisions see bullets in the order they were fired, same as
+# the old list.
+# Positions are plain lists by default: the game has a handful of bullets in
+# flight, and a short Python loop beats the fixed cost of NumPy calls until
+# there are a few hundred. vectorized=True keeps them in NumPy arrays
+# instead (if NumPy is installed) and moves the live part of the ring in
+# whole-array passes.
+
+class BulletPool:
+    def __init__(self, capacity=256, width=5, height=15, vectorized=False):
+        self.capacity = capacity
+        self.width = width
+        self.height = height
+        self.vectorized = vectorized and np is not None
+        if self.vectorized:
+            self.x = np.zeros(capacity, dtype=np.int64)
+            self.y = np.zeros(capacity, dtype=np.int64)
+            self.alive = np.zeros(capacity, dtype=bool)
+        else:
+            self.x = [0] * capacity
+            self.y = [0] * capacity
+            self.alive = [False] * capacity
+        self.head = 0
+        self.count = 0  # Slots in use from head, dead ones included
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def clear(self):
+        if self.vectorized:
+            self.alive[:] = False
+        else:
+            self.alive[:] = [False] * self.capacity
+        self.head = 0
+        self.count = 0
+        self.size = 0
+
+    def spawn(self, x, y):
+        if self.count == self.capacity:
+            self.compact()
+            if self.count == self.capacity:
+                # Still full of live bullets: the oldest one makes room
+                self.kill(self.head)
+                self._trim()
+        slot = (self.head + self.count) % self.capacity
+        self.x[slot] = x
+        self.y[slot] = y
+        self.alive[slot] = True
+        self.count += 1
+        self.size += 1
+        return slot
+
+    def kill(self, slot):
+        if self.alive[slot]:
+            self.alive[slot] = False
+            self.size -= 1
+
+    # Move every bullet up by speed and drop the ones past the top edge
+    def update(self, speed):
+        if not self.size:
+            return
+        if self.vectorized:
+            for start, end in self._spans():
+                y = self.y[start:end]
+                y -= speed
+                alive = self.alive[start:end]
+                gone = (y < -self.height) & alive
+                if gone.any():
+                    alive &= ~gone
+                    self.size -= int(np.count_nonzero(gone))
+        else:
+            y = self.y
+            alive = self.alive
+            top = -self.height
+            for start, end in self._spans():
+                for slot in range(start, end):
+                    if alive[slot]:
+                        y[slot] -= speed
+                        if y[slot] < top:
+                            alive[slot] = False
+                            self.size -= 1
+        self._trim()
+
+    # The slots in use as (start, end) index ranges, two if the ring wraps
+    def _spans(self):
+        end = self.head + self.count
+        if end <= self.capacity:
+            return ((self.head, end),)
+        return ((self.head, self.capacity), (0, end - self.capacity))
+
+    # Release dead slots at both ends of the ring
+    def _trim(self):
+        alive = self.alive
+        while self.count and not alive[self.head]:
+            self.head = (self.head + 1) % self.capacity
+            self.count -= 1
+        while self.count and not alive[(self.head + self.count - 1) % self.capacity]:
+            self.count -= 1
+        if not self.count:
+            self.head = 0
+
+    # Close the holes left by hits, keeping spawn order
+    def compact(self):
+        _, xs, ys = self.live()
+        self.clear()
+        for x, y in zip(xs, ys):
+            self.spawn(x, y)
+
+    # Live slots, oldest first
+    def live_slots(self):
+        if self.vectorized:
+            ring = (self.head + np.arange(self.count)) % self.capacity
+            return ring[self.alive[ring]].tolist()
+        alive = self.alive
+        return [slot for start, end in self._spans() for slot in range(start, end) if alive[slot]]
+
+    # Live slots with their x and y, as plain lists, oldest first
+    def live(self):
+        if self.vectorized:
+            end = self.head + self.count
+            if end <= self.capacity:
+                # Ring doesn't wrap, plain slices will do
+                alive = self.alive[self.head:end]
+                slots = np.flatnonzero(alive) + self.head
+                return slots.tolist(), self.x[self.head:end][alive].tolist(), self.y[self.head:end][alive].tolist()
+            ring = (self.head + np.arange(self.count)) % self.capacity
+            ring = ring[self.alive[ring]]
+            return ring.tolist(), self.x[ring].tolist(), self.y[ring].tolist()
+        end = self.head + self.count
+        if self.size == self.count and end <= self.capacity:
+            # No holes and no wrap (the usual case), plain slices will do
+            return list(range(self.head, end)), self.x[self.head:end], self.y[self.head:end]
+        slots = self.live_slots()
+        x = self.x
+        y = self.y
+        return slots, [x[slot] for slot in slots], [y[slot] for slot in slots]
+
+    # (x, y, width, height) of each live bullet, oldest first
+    def __iter__(self):
+        _, xs, ys = self.live()
+        for x, y in zip(xs, ys):
+            yield (x, y, self.width, self.height)
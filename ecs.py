@@ -0,0 +1,27 @@
+# Minimal entity-component store.
+# An entity is any object (WORK.py uses the enemies themselves). Each
+# component kind has its own store mapping entity -> component, so a system
+# loops over exactly the entities that have its component instead of
+# asking every entity what it is with isinstance()/hasattr(). Stores keep
+# insertion order, so systems visit entities in the order they were added.
+
+class World:
+    def __init__(self, *kinds):
+        self.stores = {kind: {} for kind in kinds}
+
+    def __getitem__(self, kind):
+        return self.stores[kind]
+
+    # components: {kind: component}
+    def add(self, entity, components):
+        stores = self.stores
+        for kind, component in components.items():
+            stores[kind][entity] = component
+
+    def remove(self, entity):
+        for store in self.stores.values():
+            store.pop(entity, None)
+
+    def clear(self):
+        for store in self.stores.values():
+            store.clear()
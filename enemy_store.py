@@ -0,0 +1,232 @@
+import numpy as np
+import pygame
+
+from bezier import STEPS, BezierPath, bernstein_array
+from game_core import ENEMY_WIDTH, ENEMY_HEIGHT, SCREEN_WIDTH, Enemy
+
+# Struct-of-arrays enemy storage for big waves.
+# Positions, health, state flags and the current path of every enemy live in
+# contiguous NumPy arrays, so path following, the formation shift and its
+# bounds check run as whole-array operations. Each enemy is still handed out
+# as an EnemyView, which behaves like an Enemy for the rest of the game.
+#
+# Usage: GameState(store=EnemyStore())
+
+# State flags, combined in the state array
+IN_FORMATION = 1
+RETURNING = 2
+LOOPING = 4
+
+PATH_LENGTH = STEPS + 1
+
+class EnemyStore:
+    def __init__(self, capacity=64):
+        self.count = 0
+        self.views = []
+        self.basis = bernstein_array(STEPS)
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        self.capacity = capacity
+        self.x = np.zeros(capacity, dtype=np.int64)
+        self.y = np.zeros(capacity, dtype=np.int64)
+        self.origin_x = np.zeros(capacity, dtype=np.int64)
+        self.origin_y = np.zeros(capacity, dtype=np.int64)
+        self.health = np.zeros(capacity, dtype=np.int64)
+        self.state = np.zeros(capacity, dtype=np.uint8)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.controls = np.zeros((capacity, 8), dtype=np.float64)  # x0, y0 ... x3, y3
+        self.path_index = np.zeros(capacity, dtype=np.int64)
+
+    def _grow(self):
+        old = (self.x, self.y, self.origin_x, self.origin_y, self.health,
+               self.state, self.alive, self.controls, self.path_index)
+        self._allocate(self.capacity * 2)
+        new = (self.x, self.y, self.origin_x, self.origin_y, self.health,
+               self.state, self.alive, self.controls, self.path_index)
+        for src, dst in zip(old, new):
+            dst[:len(src)] = src
+
+    def __len__(self):
+        return int(self.alive[:self.count].sum())
+
+    # Slots are handed out in spawn order and never reused within a wave, so
+    # slot order is the same as the order of the game's enemy list
+    def clear(self):
+        self.count = 0
+        self.views = []
+        self.alive[:] = False
+
+    def add(self, view):
+        if self.count == self.capacity:
+            self._grow()
+        slot = self.count
+        self.count += 1
+        self.views.append(view)
+        self.alive[slot] = True
+        self.state[slot] = 0
+        self.path_index[slot] = 0
+        return slot
+
+    def spawn(self, start_x, start_y, target_x, target_y, enemy_type, rng):
+        return EnemyView(self, start_x, start_y, target_x, target_y, enemy_type, rng)
+
+    # Only the given enemies stay alive (create_wave can spawn and drop some)
+    def keep(self, enemies):
+        self.alive[:self.count] = False
+        self.alive[[e.slot for e in enemies]] = True
+
+    # --- Per-tick updates ---
+    # Same rules as Enemy.update_entry()/update_dive() as driven by
+    # GameState.step(): entering and diving enemies follow their path and
+    # settle into formation at the end, returning enemies do the same and
+    # stop returning. Anything rarer falls back to the view's own method.
+    def update_paths(self):
+        n = self.count
+        state = self.state[:n]
+        alive = self.alive[:n]
+        index = self.path_index[:n]
+        entering = alive & ((state & (IN_FORMATION | RETURNING)) == 0)
+        returning = alive & ((state & RETURNING) != 0)
+        moving = (entering | returning) & (index < PATH_LENGTH)
+
+        slots = np.flatnonzero(moving)
+        if len(slots):
+            basis = self.basis[index[slots]]
+            c = self.controls[slots]
+            # Same term order as BezierPath, so positions match exactly
+            px = basis[:, 0] * c[:, 0] + basis[:, 1] * c[:, 2] + basis[:, 2] * c[:, 4] + basis[:, 3] * c[:, 6]
+            py = basis[:, 0] * c[:, 1] + basis[:, 1] * c[:, 3] + basis[:, 2] * c[:, 5] + basis[:, 3] * c[:, 7]
+            self.x[slots] = px.astype(np.int64)
+            self.y[slots] = py.astype(np.int64)
+            self.path_index[slots] += 1
+
+        arrived = entering & ~moving
+        finished = returning & ~moving
+        looping = finished & ((state & LOOPING) != 0)
+        settled = arrived | (finished & ~looping)
+        if settled.any():
+            state[finished & ~looping] &= ~np.uint8(RETURNING)
+            state[settled] |= IN_FORMATION
+            self.x[:n][settled] = self.origin_x[:n][settled]
+            self.y[:n][settled] = self.origin_y[:n][settled]
+            # The flags were set in bulk, so tell the formation index here
+            for slot in np.flatnonzero(settled):
+                view = self.views[slot]
+                if view.formation is not None:
+                    view.formation.add(view)
+        for slot in np.flatnonzero(looping):
+            self.views[slot].update_dive()
+
+    def shift_formation(self, speed, pattern_state):
+        n = self.count
+        members = self.alive[:n] & ((self.state[:n] & IN_FORMATION) != 0)
+        if not members.any():
+            return
+        xs = self.x[:n][members]
+        dx = speed * pattern_state["direction"]
+        if xs.min() + dx < 0 or xs.max() + ENEMY_WIDTH + dx > SCREEN_WIDTH:
+            pattern_state["direction"] *= -1
+            dx = speed * pattern_state["direction"]
+        moved = xs + dx
+        # pygame.Rect rounds half away from zero when given a float
+        moved = np.where(moved >= 0, np.floor(moved + 0.5), np.ceil(moved - 0.5)).astype(np.int64)
+        self.x[:n][members] = moved
+        self.origin_x[:n][members] = moved
+        self.origin_y[:n][members] = self.y[:n][members]
+
+    # --- Broadphase interface shared with SpatialHash ---
+    def sync(self, enemies):
+        pass  # Positions already live in the arrays
+
+    def remove(self, view):
+        self.alive[view.slot] = False
+
+    # The first live enemy in spawn order that collides with rect, or None
+    def first_hit(self, rect):
+        n = self.count
+        if not n:
+            return None
+        x = self.x[:n]
+        y = self.y[:n]
+        hit = (
+            self.alive[:n]
+            & (x < rect.right) & (x + ENEMY_WIDTH > rect.x)
+            & (y < rect.bottom) & (y + ENEMY_HEIGHT > rect.y)
+        )
+        slot = int(hit.argmax())
+        if not hit[slot]:
+            return None
+        return self.views[slot]
+
+def _flag_property(flag):
+    def get(self):
+        return bool(self.store.state[self.slot] & flag)
+
+    def set(self, value):
+        if value:
+            self.store.state[self.slot] |= flag
+        else:
+            self.store.state[self.slot] &= ~np.uint8(flag)
+
+    return property(get, set)
+
+# An Enemy whose per-tick state lives in an EnemyStore row. Behaviour code
+# (dives, returns, hits) runs the normal Enemy methods against it.
+class EnemyView(Enemy):
+    def __init__(self, store, start_x, start_y, target_x, target_y, enemy_type, rng):
+        self.store = store
+        self.slot = store.add(self)
+        super().__init__(start_x, start_y, target_x, target_y, enemy_type, rng)
+
+    _in_formation = _flag_property(IN_FORMATION)  # Read through Enemy.in_formation
+    returning = _flag_property(RETURNING)
+    looping = _flag_property(LOOPING)
+
+    # A fresh Rect every time; move with move_to(), not by editing it
+    @property
+    def rect(self):
+        return pygame.Rect(int(self.store.x[self.slot]), int(self.store.y[self.slot]), ENEMY_WIDTH, ENEMY_HEIGHT)
+
+    @rect.setter
+    def rect(self, rect):
+        self.move_to(rect.x, rect.y)
+
+    def move_to(self, x, y):
+        self.store.x[self.slot] = x
+        self.store.y[self.slot] = y
+
+    @property
+    def health(self):
+        return int(self.store.health[self.slot])
+
+    @health.setter
+    def health(self, value):
+        self.store.health[self.slot] = value
+
+    @property
+    def path_index(self):
+        return int(self.store.path_index[self.slot])
+
+    @path_index.setter
+    def path_index(self, value):
+        self.store.path_index[self.slot] = value
+
+    @property
+    def original_pos(self):
+        return (int(self.store.origin_x[self.slot]), int(self.store.origin_y[self.slot]))
+
+    @original_pos.setter
+    def original_pos(self, pos):
+        self.store.origin_x[self.slot], self.store.origin_y[self.slot] = pos
+
+    @property
+    def path(self):
+        c = self.store.controls[self.slot].tolist()
+        return BezierPath((c[0], c[1]), (c[2], c[3]), (c[4], c[5]), (c[6], c[7]))
+
+    @path.setter
+    def path(self, path):
+        if path.steps != STEPS or path.stride != 1:
+            raise ValueError("EnemyStore only holds full-length paths")
+        self.store.controls[self.slot] = [value for point in path.controls() for value in point]
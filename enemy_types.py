@@ -0,0 +1,29 @@
+# Enemy type registry.
+# Every enemy type gets a small integer id, and its stats live in flat
+# per-type tables indexed by that id. Code that branches on the type
+# compares ints instead of whole dicts, and code that needs a stat indexes a
+# list. A new type is one define() call.
+
+class EnemyTypes:
+    def __init__(self):
+        self.name = []
+        self.color = []
+        self.points = []
+        self.can_shoot = []
+        self.health = []  # Base health; waves may hand out more
+        self.drop_rate = []  # Chance of dropping a power-up when killed
+        self.one_hit = []  # Dies to the first hit whatever its health
+
+    def __len__(self):
+        return len(self.name)
+
+    # Returns the new type's id
+    def define(self, name, color, points, can_shoot, health, drop_rate=0.0, one_hit=False):
+        self.name.append(name)
+        self.color.append(color)
+        self.points.append(points)
+        self.can_shoot.append(can_shoot)
+        self.health.append(health)
+        self.drop_rate.append(drop_rate)
+        self.one_hit.append(one_hit)
+        return len(self.name) - 1
@@ -0,0 +1,143 @@
+import heapq
+
+# Set of the enemies currently in formation.
+# Members sit in a plain list with a position map next to it, so adding,
+# removing (the last member is swapped into the hole) and drawing random
+# members are all constant time however big the wave gets. Enemies keep it
+# up to date themselves whenever their in_formation flag changes.
+
+class FormationIndex:
+    def __init__(self):
+        self.members = []
+        self.positions = {}  # member -> index in members
+
+    def __len__(self):
+        return len(self.members)
+
+    def __contains__(self, item):
+        return item in self.positions
+
+    def __iter__(self):
+        return iter(self.members)
+
+    def clear(self):
+        self.members.clear()
+        self.positions.clear()
+
+    def add(self, item):
+        if item not in self.positions:
+            self.positions[item] = len(self.members)
+            self.members.append(item)
+
+    def discard(self, item):
+        index = self.positions.pop(item, None)
+        if index is None:
+            return
+        last = self.members.pop()
+        if index < len(self.members):
+            self.members[index] = last
+            self.positions[last] = index
+
+    # Up to count random members that are not in exclude. exclude should be
+    # small (the current divers), the cost doesn't depend on the wave size.
+    def sample(self, rng, count, exclude=()):
+        skipped = sum(1 for item in exclude if item in self.positions)
+        picks = rng.sample(self.members, min(len(self.members), count + skipped))
+        return [item for item in picks if item not in exclude][:count]
+
+# The formation as one transform.
+# Members are anchored at a fixed spot relative to the formation's offset
+# (x, y) and work out their world position from it when asked, so moving
+# the whole formation is a single add on the offset however many members
+# it has. The left edges of the anchors are kept in a counted multiset with
+# a heap at each end, so the formation's bounds are updated as members join,
+# leave or are moved instead of being recomputed from every member.
+#
+# Members need an anchor attribute (None when not anchored), original_pos
+# (where a joining member is anchored) and move_to() (where a leaving member
+# is left).
+
+class Formation(FormationIndex):
+    def __init__(self, width):
+        super().__init__()
+        self.width = width  # Of every member, for the right-hand bound
+        self.x = 0
+        self.y = 0
+        self.lefts = {}  # anchor left edge -> number of members on it
+        self.low = []  # Min-heap of anchor left edges (may hold stale ones)
+        self.high = []  # Same with the edges negated, for the max
+
+    # Members are left where they are, unanchored
+    def clear(self):
+        for item in self.members:
+            x, y = self.position(item)
+            item.anchor = None
+            item.move_to(x, y)
+            item.original_pos = (x, y)
+        super().clear()
+        self.x = 0
+        self.y = 0
+        self.lefts.clear()
+        self.low.clear()
+        self.high.clear()
+
+    def add(self, item):
+        if item not in self.positions:
+            super().add(item)
+            x, y = item.original_pos
+            self._anchor(item, x, y)
+
+    def discard(self, item):
+        if item in self.positions:
+            x, y = self.position(item)
+            self._unanchor(item)
+            super().discard(item)
+            item.move_to(x, y)
+            item.original_pos = (x, y)
+
+    def position(self, item):
+        ax, ay = item.anchor
+        return self.x + ax, self.y + ay
+
+    # Re-anchor a member so it is at world position (x, y) right now
+    def move(self, item, x, y):
+        self._unanchor(item)
+        self._anchor(item, x, y)
+
+    def shift(self, dx, dy=0):
+        self.x += dx
+        self.y += dy
+
+    # (left, right) world edges of the members; call only when non-empty
+    def bounds(self):
+        lefts = self.lefts
+        low = self.low
+        high = self.high
+        while low[0] not in lefts:
+            heapq.heappop(low)
+        while -high[0] not in lefts:
+            heapq.heappop(high)
+        return self.x + low[0], self.x - high[0] + self.width
+
+    def _anchor(self, item, x, y):
+        left = x - self.x
+        item.anchor = (left, y - self.y)
+        count = self.lefts.get(left, 0)
+        self.lefts[left] = count + 1
+        if not count:
+            heapq.heappush(self.low, left)
+            heapq.heappush(self.high, -left)
+            # Stale edges only leave the heaps from the top; rebuild them
+            # before a member moving every frame can make them pile up
+            if len(self.low) > 2 * len(self.lefts) + 64:
+                self.low = sorted(self.lefts)
+                self.high = sorted(-left for left in self.lefts)
+
+    def _unanchor(self, item):
+        left = item.anchor[0]
+        item.anchor = None
+        count = self.lefts[left] - 1
+        if count:
+            self.lefts[left] = count
+        else:
+            del self.lefts[left]
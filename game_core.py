@@ -0,0 +1,629 @@
+import math
+import sys
+import time
+from collections import deque
+
+import pygame
+
+from bezier import BezierPath
+from bullet_pool import BulletPool
+from enemy_types import EnemyTypes
+from formation import Formation, FormationIndex
+from game_rng import GameRNG
+from spatial_hash import PlainScan, SpatialHash
+from status import StatusEffects
+
+# Headless simulation core for From Beyond.
+# Everything here runs on simulation time, so it can be stepped without a
+# window and as fast as the machine allows. Video_Games_Final_Clean.py is the
+# renderer/input shell around it.
+
+# --- Constants ---
+PLAYER_LIVES = 3
+SCREEN_WIDTH = 800
+SCREEN_HEIGHT = 700
+ENEMY_WIDTH = 30
+ENEMY_HEIGHT = 30
+PLAYER_WIDTH = 30
+PLAYER_HEIGHT = 30
+
+FPS = 60
+FRAME_MS = 1000 / FPS  # Simulation time advanced by one step
+MAX_EFFECTS = 256  # Effect events kept between snapshots
+RESPAWN_INVINCIBILITY = 3000  # ms of invincibility after respawning or a new round
+
+# --- Enemy types ---
+# Each name is an integer id into the ENEMY_TYPES tables
+ENEMY_TYPES = EnemyTypes()
+BEE = ENEMY_TYPES.define("bee", (255, 255, 0), 30, False, 1, drop_rate=0.1, one_hit=True)
+BUTTERFLY = ENEMY_TYPES.define("butterfly", (0, 0, 255), 40, True, 2, drop_rate=0.1)
+BOSS = ENEMY_TYPES.define("boss", (128, 0, 128), 50, True, 10, drop_rate=0.2)
+RED = ENEMY_TYPES.define("red", (255, 0, 0), 60, True, 3, drop_rate=0.1)
+PHANTOM = ENEMY_TYPES.define("phantom", (180, 0, 180), 80, False, 2, one_hit=True)  # New enemy
+
+# --- Power-ups ---
+POWERUPS = {
+    "shield": {"color": (0, 255, 255), "duration": 5000},
+    "rapid_fire": {"color": (255, 140, 0), "duration": 7000},
+    "spread_shot": {"color": (0, 255, 0), "duration": 7000},
+}
+
+# Used by enemies created without a game's RNG (unseeded)
+DEFAULT_RNG = GameRNG()
+
+def random_controls(rng):
+    paths = rng.paths
+    control1 = (paths.randint(50, SCREEN_WIDTH - 50), paths.randint(100, 250))
+    control2 = (paths.randint(50, SCREEN_WIDTH - 50), paths.randint(250, 400))
+    return control1, control2
+
+class Enemy:
+    formation = None  # Formation (or FormationIndex) kept in step with in_formation, if set
+
+    def __init__(self, start_x, start_y, target_x, target_y, enemy_type, rng=DEFAULT_RNG):
+        self.rng = rng
+        self.anchor = None  # Spot relative to a Formation while in one
+        self.rect = pygame.Rect(start_x, start_y, ENEMY_WIDTH, ENEMY_HEIGHT)
+        self.color = ENEMY_TYPES.color[enemy_type]
+        self.points = ENEMY_TYPES.points[enemy_type]
+        self.can_shoot = ENEMY_TYPES.can_shoot[enemy_type]
+        self.type = enemy_type
+        self.health = ENEMY_TYPES.health[enemy_type]
+        self.in_formation = False
+        self.returning = False
+        self.looping = False
+        self.hit_once = False  # For phantom enemy special mechanic
+        self.path = self.generate_entry_path((start_x, start_y), (target_x, target_y))
+        self.path_index = 0
+        self.original_pos = (target_x, target_y)
+        self.target_pos = (target_x, target_y)
+
+    # While anchored in a Formation, the rect and original_pos follow the
+    # formation's offset and are only worked out when read. Move the enemy
+    # with move_to(), not by editing its rect.
+    @property
+    def rect(self):
+        rect = self._rect
+        anchor = self.anchor
+        if anchor is not None:
+            formation = self.formation
+            rect.x = formation.x + anchor[0]
+            rect.y = formation.y + anchor[1]
+        return rect
+
+    @rect.setter
+    def rect(self, rect):
+        self._rect = rect
+
+    @property
+    def original_pos(self):
+        if self.anchor is not None:
+            return self.formation.position(self)
+        return self._original_pos
+
+    @original_pos.setter
+    def original_pos(self, pos):
+        self._original_pos = pos
+
+    @property
+    def in_formation(self):
+        return self._in_formation
+
+    @in_formation.setter
+    def in_formation(self, value):
+        self._in_formation = value
+        if self.formation is not None:
+            if value:
+                self.formation.add(self)
+            else:
+                self.formation.discard(self)
+
+    def generate_entry_path(self, start, end):
+        control1, control2 = random_controls(self.rng)
+        return BezierPath(start, control1, control2, end)
+
+    def move_to(self, x, y):
+        if self.anchor is not None:
+            self.formation.move(self, x, y)
+        else:
+            self._rect.x, self._rect.y = x, y
+
+    def update_entry(self):
+        if self.path_index < len(self.path):
+            self.move_to(*map(int, self.path[self.path_index]))
+            self.path_index += 1
+        else:
+            self.in_formation = True
+            self.move_to(*self.original_pos)
+
+    def start_dive(self, player_x, player_y):
+        self.returning = False
+        self.looping = False
+        # Phantom teleport mechanic: skips dive, teleports back when hit once
+        if self.type == PHANTOM and self.hit_once:
+            self.return_to_formation()
+            return
+
+        if self.type == BUTTERFLY:
+            offset_x = self.rng.paths.choice([-150, 150])
+            dive_target = (player_x + offset_x, SCREEN_HEIGHT + 100)
+        else:
+            dive_target = (player_x, SCREEN_HEIGHT + 100)
+        self.path = self.generate_entry_path((self.rect.x, self.rect.y), dive_target)
+        self.path_index = 0
+        self.in_formation = False
+
+    def loop_from_bottom(self):
+        self.looping = True
+        start = (self.rect.x, -100)
+        self.path = self.generate_entry_path((self.rect.x, SCREEN_HEIGHT + 50), start)
+        self.path_index = 0
+
+    def return_to_formation(self):
+        self.returning = True
+        start = (self.rng.paths.randint(0, SCREEN_WIDTH), -100)
+        self.path = self.generate_entry_path(start, self.original_pos)
+        self.path_index = 0
+
+    def update_dive(self):
+        if self.path_index < len(self.path):
+            self.move_to(*map(int, self.path[self.path_index]))
+            self.path_index += 1
+        else:
+            if self.looping:
+                self.return_to_formation()
+                self.looping = False
+            elif not self.returning and self.rect.bottom >= SCREEN_HEIGHT:
+                self.loop_from_bottom()
+            elif self.returning:
+                self.in_formation = True
+                self.returning = False
+                self.move_to(*self.original_pos)
+
+class PowerUp:
+    def __init__(self, x, y, kind):
+        self.rect = pygame.Rect(x, y, 20, 20)
+        self.kind = kind
+        self.color = POWERUPS[kind]["color"]
+        self.duration = POWERUPS[kind]["duration"]
+        self.speed = 3
+
+    def update(self):
+        self.rect.y += self.speed
+
+# With a store (see enemy_store.py) the wave is spawned into its arrays
+def create_wave(round_count, rng=DEFAULT_RNG, store=None, rows=5):
+    enemies = []
+    start_y = 80
+    cols = 6
+    spawn = Enemy if store is None else store.spawn
+
+    x_spacing = ENEMY_WIDTH + 20
+    y_spacing = ENEMY_HEIGHT + 20
+    formation_width = cols * x_spacing - 20
+    left_offset = (SCREEN_WIDTH - formation_width) // 2
+
+    base_health = 1 + (round_count - 1)  # Increase enemy health per round
+
+    # Boss wave every 5 rounds
+    boss_wave = (round_count % 5 == 0)
+
+    for row in range(rows):
+        for col in range(cols):
+            x = left_offset + col * x_spacing
+            y = start_y + row * y_spacing
+
+            if boss_wave:
+                enemy_type = BOSS
+            else:
+                if row == 0:
+                    enemy_type = BOSS
+                elif row == 1:
+                    enemy_type = RED
+                elif row == 2:
+                    enemy_type = BUTTERFLY
+                elif row == 3:
+                    enemy_type = PHANTOM
+                else:
+                    enemy_type = BEE
+
+            enemy = spawn(rng.spawns.randint(-400, SCREEN_WIDTH + 400), -100, x, y, enemy_type, rng)
+            # Increase health progressively
+            if enemy_type == BOSS:
+                enemy.health = ENEMY_TYPES.health[BOSS] + round_count // 2
+            else:
+                enemy.health = 2
+                enemies.append(enemy)
+
+    return enemies
+
+# --- Input snapshot for one simulation step ---
+class Inputs:
+    def __init__(self, left=False, right=False, up=False, down=False, shoot=False):
+        self.left = left
+        self.right = right
+        self.up = up
+        self.down = down
+        self.shoot = shoot
+
+NO_INPUT = Inputs()
+
+# --- What one frame looks like, for drawing ---
+# Built by GameState.snapshot(). Holds plain values and tuples only, so it
+# can be handed to another thread or kept around after the game moves on.
+# Entities are (key, x, y, ...) tuples; key tells the same entity apart
+# across snapshots.
+class Snapshot:
+    def __init__(self, frame, time, score, lives, round_count, game_over, player, player_alive, invincible,
+                 bullets, enemy_bullets, enemies, powerups, effects=()):
+        self.frame = frame
+        self.time = time
+        self.score = score
+        self.lives = lives
+        self.round_count = round_count
+        self.game_over = game_over
+        self.player = player  # (x, y, width, height)
+        self.player_alive = player_alive
+        self.invincible = invincible
+        self.bullets = bullets  # (key, x, y)
+        self.enemy_bullets = enemy_bullets  # (key, x, y)
+        self.enemies = enemies  # (key, x, y, color, boss health ratio or None)
+        self.powerups = powerups  # (key, x, y, width, height, color)
+        self.effects = effects  # ("kill" | "hit" | "player", x, y, color) since the last snapshot
+
+class GameState:
+    def __init__(self, lives=PLAYER_LIVES, seed=None, store=None, wave_rows=5, grid=False):
+        self.rng = GameRNG(seed)
+        # Optional array-backed EnemyStore; it also stands in for the grid
+        self.store = store
+        self.wave_rows = wave_rows
+        self.time = 0.0  # Simulation time in milliseconds
+        self.frame = 0
+        self.game_over = False
+
+        self.player = pygame.Rect(SCREEN_WIDTH // 2 - PLAYER_WIDTH // 2, SCREEN_HEIGHT - 70, PLAYER_WIDTH, PLAYER_HEIGHT)
+        self.player_speed = 5
+        self.bullets = BulletPool()
+        self.bullet_probe = pygame.Rect(0, 0, 5, 15)  # Reused for collision tests
+        self.enemy_bullets = []
+        self.bullet_speed = 10
+        self.enemy_bullet_speed = 6
+        self.shoot_cooldown = 500
+        self.last_shot_time = 0
+
+        self.round_count = 1
+        # Bullet vs enemy broadphase. The spatial hash only beats a plain scan
+        # with dozens of bullets against thousands of enemies
+        # (bench_collisions.py), so it is opt-in.
+        if store is not None:
+            self.enemy_grid = store
+        elif grid:
+            self.enemy_grid = SpatialHash(ENEMY_WIDTH)
+        else:
+            self.enemy_grid = PlainScan()
+        # The SoA store shifts its own arrays, so it only needs the index
+        self.formation = Formation(ENEMY_WIDTH) if store is None else FormationIndex()
+        self.enemies = self.new_wave()
+        self.formation_speed = 1.5
+
+        self.lives = lives
+        self.score = 0
+        self.diving_enemies = {}  # Used as an ordered set, values are unused
+
+        self.max_divers = 3
+
+        self.player_alive = True
+        self.invincible = False
+        self.enemies_returning = False
+
+        self.pattern_state = {"direction": 1}
+
+        self.powerups = []
+
+        self.perf = None  # Optional perf.PerfMonitor, step() marks its phases on it
+        # (kind, x, y, color) of kills and hits since the last snapshot, for
+        # effects. Bounded so headless runs without snapshots don't pile up.
+        self.effects = deque(maxlen=MAX_EFFECTS)
+
+        # Active power-ups and respawn invincibility, each with a deadline
+        # on game time and a callback that undoes it when it runs out
+        self.status = StatusEffects()
+        self.status.on_expire["shield"] = self.end_invincibility
+        self.status.on_expire["respawn"] = self.end_invincibility
+        self.status.on_expire["rapid_fire"] = self.end_rapid_fire
+
+    # Helper function to activate power-ups. Picking up one that is already
+    # active restarts its timer.
+    def activate_powerup(self, kind):
+        self.status.apply(kind, POWERUPS[kind]["duration"])
+
+        if kind == "shield":
+            self.invincible = True
+        elif kind == "rapid_fire":
+            self.shoot_cooldown = 200
+        elif kind == "spread_shot":
+            pass  # handled in shooting logic
+
+    def start_respawn_invincibility(self):
+        self.invincible = True
+        self.status.apply("respawn", RESPAWN_INVINCIBILITY)
+
+    # Shield and respawn invincibility overlap, the player stays invincible
+    # until both have run out
+    def end_invincibility(self, name):
+        self.invincible = "shield" in self.status or "respawn" in self.status
+
+    def end_rapid_fire(self, name):
+        self.shoot_cooldown = 500
+
+    # Player got hit: clear the field and respawn, or end the game
+    def lose_life(self):
+        self.effects.append(("player", self.player.centerx, self.player.centery, (255, 255, 255)))
+        self.lives -= 1
+        self.player_alive = False
+        self.bullets.clear()
+        self.diving_enemies.clear()
+        self.enemy_bullets.clear()
+        self.powerups.clear()
+        self.status.expire_all()
+        if self.lives > 0:
+            self.player.x = SCREEN_WIDTH // 2 - PLAYER_WIDTH // 2
+            self.player.y = SCREEN_HEIGHT - 70
+            self.player_alive = True
+            self.start_respawn_invincibility()
+        else:
+            self.game_over = True
+
+    def new_wave(self):
+        if self.store is not None:
+            self.store.clear()
+        self.formation.clear()
+        enemies = create_wave(self.round_count, self.rng, self.store, self.wave_rows)
+        if self.store is not None:
+            self.store.keep(enemies)
+        for e in enemies:
+            e.formation = self.formation
+        return enemies
+
+    def shift_formation(self):
+        formation = self.formation
+        if formation:
+            dx = self.formation_speed * self.pattern_state["direction"]
+            min_x, max_x = formation.bounds()
+
+            if min_x + dx < 0 or max_x + dx > SCREEN_WIDTH:
+                self.pattern_state["direction"] *= -1
+                dx = self.formation_speed * self.pattern_state["direction"]
+
+            # Members sit on whole pixels. pygame.Rect rounds half away from
+            # zero and the bounds check keeps every member at x >= 0, so they
+            # all move by the same rounded step.
+            formation.shift(math.floor(dx + 0.5))
+
+    def drop_powerup(self, e, chance):
+        drops = self.rng.drops
+        if drops.random() < chance:
+            kind = drops.choice(list(POWERUPS.keys()))
+            self.powerups.append(PowerUp(e.rect.centerx, e.rect.centery, kind))
+
+    def snapshot(self):
+        boss_health = ENEMY_TYPES.health[BOSS] + self.round_count // 2
+        enemies = []
+        for e in self.enemies:
+            rect = e.rect
+            enemies.append((id(e), rect.x, rect.y, e.color, e.health / boss_health if e.type == BOSS else None))
+        slots, xs, ys = self.bullets.live()
+        return Snapshot(
+            self.frame, self.time, self.score, self.lives, self.round_count, self.game_over,
+            tuple(self.player), self.player_alive, self.invincible,
+            tuple(zip(slots, xs, ys)),
+            tuple((id(eb), eb.x, eb.y) for eb in self.enemy_bullets),
+            tuple(enemies),
+            tuple((id(p), p.rect.x, p.rect.y, p.rect.w, p.rect.h, p.color) for p in self.powerups),
+            self._take_effects(),
+        )
+
+    def _take_effects(self):
+        effects = tuple(self.effects)
+        self.effects.clear()
+        return effects
+
+    # Advance the simulation by one fixed timestep
+    def step(self, inputs=NO_INPUT):
+        if self.game_over:
+            return
+        self.time += FRAME_MS
+        self.frame += 1
+        current_time = self.time
+        player = self.player
+        perf = self.perf
+
+        # Power-up and invincibility expiry
+        self.status.update(current_time)
+        if perf is not None:
+            perf.mark("expiry")
+
+        if self.player_alive and not self.enemies_returning:
+            if inputs.left and player.left > 0:
+                player.x -= self.player_speed
+            if inputs.right and player.right < SCREEN_WIDTH:
+                player.x += self.player_speed
+            if inputs.up and player.top > SCREEN_HEIGHT - 200:
+                player.y -= self.player_speed
+            if inputs.down and player.bottom < SCREEN_HEIGHT - 30:
+                player.y += self.player_speed
+            if inputs.shoot and not self.invincible and current_time - self.last_shot_time >= self.shoot_cooldown:
+                if "spread_shot" in self.status:
+                    # Fire three bullets spread
+                    self.bullets.spawn(player.centerx - 2, player.top)
+                    self.bullets.spawn(player.centerx - 10, player.top + 5)
+                    self.bullets.spawn(player.centerx + 6, player.top + 5)
+                else:
+                    self.bullets.spawn(player.centerx - 2, player.top)
+                self.last_shot_time = current_time
+
+        if perf is not None:
+            perf.mark("input")
+
+        # Update bullets
+        self.bullets.update(self.bullet_speed)
+
+        # Update enemy bullets
+        for eb in self.enemy_bullets[:]:
+            eb.y += self.enemy_bullet_speed
+            if eb.top > SCREEN_HEIGHT:
+                self.enemy_bullets.remove(eb)
+            elif eb.colliderect(player) and not self.invincible:
+                self.lose_life()
+                if self.game_over:
+                    return
+                break
+
+        # Diving enemy collision damage
+        for diver in self.diving_enemies:
+            if diver.rect.colliderect(player) and not self.invincible:
+                self.lose_life()
+                if self.game_over:
+                    return
+                break
+
+        if perf is not None:
+            perf.mark("bullets")
+
+        # Update enemies (entry or dive)
+        if self.store is not None:
+            self.store.update_paths()
+        else:
+            for enemy in self.enemies:
+                if not enemy.in_formation and not enemy.returning:
+                    enemy.update_entry()
+                elif enemy.returning or not enemy.in_formation:
+                    enemy.update_dive()
+
+        if perf is not None:
+            perf.mark("enemies")
+
+        # Move formation enemies side to side
+        if self.store is not None:
+            self.store.shift_formation(self.formation_speed, self.pattern_state)
+        else:
+            self.shift_formation()
+
+        if perf is not None:
+            perf.mark("formation")
+
+        # Enemies start diving if allowed
+        diving_enemies = self.diving_enemies
+        if self.player_alive and not self.enemies_returning and len(diving_enemies) < self.max_divers:
+            needed = self.max_divers - len(diving_enemies)
+            for diver in self.formation.sample(self.rng.ai, needed, diving_enemies):
+                diver.start_dive(player.centerx, player.centery)
+                diving_enemies[diver] = None
+
+        # Update diving enemies shooting and state
+        for diver in list(diving_enemies):
+            # Enemy shoots randomly more frequently each round
+            shoot_chance = 5 + self.round_count * 3  # increases per round
+            if diver.can_shoot and self.rng.ai.randint(0, 1000) < shoot_chance:
+                bullet = pygame.Rect(diver.rect.centerx - 2, diver.rect.bottom, 5, 15)
+                self.enemy_bullets.append(bullet)
+            if diver.path_index >= len(diver.path) and not diver.returning and not diver.looping:
+                diver.return_to_formation()
+            elif diver.path_index >= len(diver.path) and diver.returning:
+                diver.in_formation = True
+                diver.returning = False
+                del diving_enemies[diver]
+
+        if perf is not None:
+            perf.mark("dives")
+
+        # Bullet collision with enemies (player bullets)
+        # With the grid each bullet only tests the enemies sharing a cell with
+        # it. Every broadphase's first_hit() picks the same enemy a scan of the
+        # whole list would
+        enemies = self.enemies
+        if self.bullets and enemies:
+            grid = self.enemy_grid
+            grid.sync(enemies)
+            dead = set()
+            one_hit = ENEMY_TYPES.one_hit
+            drop_rate = ENEMY_TYPES.drop_rate
+            bullets = self.bullets
+            probe = self.bullet_probe
+            slots, xs, ys = bullets.live()
+            for slot, probe.x, probe.y in zip(slots, xs, ys):
+                e = grid.first_hit(probe)
+                if e is None:
+                    continue
+                bullets.kill(slot)
+                kind = e.type
+                if one_hit[kind]:
+                    # Divers die immediately (except phantom teleport mechanic)
+                    if kind == PHANTOM and not e.hit_once:
+                        e.hit_once = True
+                        e.return_to_formation()
+                    else:
+                        dead.add(e)
+                else:
+                    e.health -= 1
+                    if e.health <= 0:
+                        dead.add(e)
+                if e in dead:
+                    self.score += e.points
+                    # Chance to drop power-up
+                    if drop_rate[kind]:
+                        self.drop_powerup(e, drop_rate[kind])
+                    grid.remove(e)
+                    self.formation.discard(e)
+                    diving_enemies.pop(e, None)
+                    self.effects.append(("kill", e.rect.centerx, e.rect.centery, e.color))
+                else:
+                    self.effects.append(("hit", probe.centerx, probe.top, e.color))
+            if dead:
+                self.enemies = [e for e in enemies if e not in dead]
+
+        if perf is not None:
+            perf.mark("collisions")
+
+        # Update powerups falling and player collecting
+        for p in self.powerups[:]:
+            p.update()
+            if p.rect.colliderect(player):
+                self.activate_powerup(p.kind)
+                self.powerups.remove(p)
+            elif p.rect.top > SCREEN_HEIGHT:
+                self.powerups.remove(p)
+
+        # Check if round complete
+        if not self.enemies and not self.enemies_returning:
+            self.round_count += 1
+            self.enemies = self.new_wave()
+            self.max_divers = min(5, self.round_count + 2)
+            diving_enemies.clear()
+            self.player_alive = True
+            self.start_respawn_invincibility()
+        if perf is not None:
+            perf.mark("pickups")
+
+# --- Headless driver ---
+# Simple scripted input: sweep left and right while holding fire
+def sweep_inputs(frame):
+    going_right = (frame // 120) % 2 == 0
+    return Inputs(left=not going_right, right=going_right, shoot=True)
+
+def run_headless(ticks, input_fn=sweep_inputs, lives=PLAYER_LIVES, seed=None, store=None):
+    state = GameState(lives, seed, store)
+    for _ in range(ticks):
+        state.step(input_fn(state.frame))
+        if state.game_over:
+            break
+    return state
+
+if __name__ == "__main__":
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    started = time.perf_counter()
+    state = run_headless(ticks, seed=seed)
+    elapsed = time.perf_counter() - started
+    print(f"{state.frame} ticks in {elapsed:.2f}s ({state.frame / elapsed:.0f} ticks/sec)")
+    print(f"Seed: {state.rng.seed}  Score: {state.score}  Lives: {state.lives}  Round: {state.round_count}")
@@ -0,0 +1,24 @@
+import random
+
+# Seedable random streams for the simulation.
+# Each subsystem draws from its own random.Random, so a change in how often
+# one subsystem rolls dice does not shift the numbers another one sees.
+# The same game seed always gives the same run.
+
+STREAMS = ("paths", "spawns", "ai", "drops")
+
+class GameRNG:
+    def __init__(self, seed=None):
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        self.seed = seed
+        for name in STREAMS:
+            # String seeds are hashed, so every stream gets an unrelated sequence
+            setattr(self, name, random.Random(f"{seed}:{name}"))
+
+    def state(self):
+        return {name: getattr(self, name).getstate() for name in STREAMS}
+
+    def set_state(self, state):
+        for name in STREAMS:
+            getattr(self, name).setstate(state[name])
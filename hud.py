@@ -0,0 +1,53 @@
+from game_core import SCREEN_WIDTH, SCREEN_HEIGHT
+from sprites import WHITE
+
+# HUD text without re-rasterizing it every frame.
+# Labels are rendered once. Values that change now and then (lives, round)
+# keep their last Surface and only render again when the text differs.
+# The score can change every frame, so it is put together from a digit
+# atlas: each digit is rendered once and numbers are blitted glyph by glyph.
+
+# One line of text whose Surface is kept until the text changes
+class TextItem:
+    def __init__(self, font, color=WHITE):
+        self.font = font
+        self.color = color
+        self.text = None
+        self.surface = None
+
+    def render(self, text):
+        if text != self.text:
+            self.text = text
+            self.surface = self.font.render(text, True, self.color)
+        return self.surface
+
+class DigitAtlas:
+    def __init__(self, font, color=WHITE):
+        self.glyphs = {char: font.render(char, True, color) for char in "0123456789-"}
+
+    # (glyph, position) pairs that spell out number starting at (x, y)
+    def blits(self, number, x, y):
+        items = []
+        for char in str(number):
+            glyph = self.glyphs[char]
+            items.append((glyph, (x, y)))
+            x += glyph.get_width()
+        return items
+
+class Hud:
+    def __init__(self, font, color=WHITE):
+        self.score_label = font.render("Score: ", True, color)
+        self.digits = DigitAtlas(font, color)
+        self.lives = TextItem(font, color)
+        self.round = TextItem(font, color)
+        self.pause_text = font.render("PAUSED - Press P to resume", True, color)
+
+    # Everything the HUD draws this frame, as blits() items
+    def blits(self, frame, paused=False):
+        items = [(self.score_label, (10, 10))]
+        items += self.digits.blits(frame.score, 10 + self.score_label.get_width(), 10)
+        items.append((self.lives.render(f"Lives: {frame.lives}"), (SCREEN_WIDTH - 120, 10)))
+        items.append((self.round.render(f"Round: {frame.round_count}"), (SCREEN_WIDTH // 2 - 50, 10)))
+        if paused:
+            items.append((self.pause_text, (SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2)))
+        return items
@@ -0,0 +1,63 @@
+import time
+
+import pygame
+
+from game_core import FPS
+
+# Frame pacing for the serial game loop.
+# clock.tick(FPS) only caps the frame rate: when a frame overruns, the game
+# simply runs slower, because every step moves things by a fixed amount.
+# The FramePacer keeps a schedule of when each simulation step is due
+# instead. Each frame steps() says how many steps to run before drawing:
+# one normally, more when the last frame overran, so game time keeps up
+# with the wall clock and the extra frames are just never drawn. At most
+# max_skip frames are skipped in a row; past that the backlog is dropped and
+# the game slows down rather than stalling the screen completely.
+# Frames that run no steps (paused, or the simulation is on its own thread)
+# skip steps() and only call wait(), which then just holds the frame rate;
+# the time spent that way is not owed as steps afterwards.
+# Time comes from pygame.time.get_ticks(), so anything that fakes the
+# pygame clock (bench_versions.py) fakes the pacer too.
+
+MAX_SKIP = 5  # Most frames simulated without being drawn before one is
+
+class FramePacer:
+    def __init__(self, rate=FPS, max_skip=MAX_SKIP):
+        self.step_ms = 1000 / rate
+        self.max_skip = max_skip
+        self.clock = pygame.time.Clock()
+        self.due = pygame.time.get_ticks()  # When the next step should run
+        self.frames = 0
+        self.skipped = 0  # Steps run without being drawn
+        self.dropped = 0  # Steps given up on because we were too far behind
+        self.scheduled = False  # Whether steps() ran this frame
+
+    # How many simulation steps to run this frame
+    def steps(self):
+        now = pygame.time.get_ticks()
+        steps = 1 + max(int((now - self.due) // self.step_ms), 0)
+        if steps > 1 + self.max_skip:
+            self.dropped += steps - 1 - self.max_skip
+            steps = 1 + self.max_skip
+            self.due = now - self.max_skip * self.step_ms
+        self.due += steps * self.step_ms
+        self.frames += 1
+        self.skipped += steps - 1
+        self.scheduled = True
+        return steps
+
+    # End the frame: sleep until the next step is due
+    def wait(self):
+        self.clock.tick()
+        now = pygame.time.get_ticks()
+        if not self.scheduled:
+            # Nothing was stepped: hold the frame rate, but never fall behind
+            self.due = max(self.due + self.step_ms, now)
+        self.scheduled = False
+        delay = self.due - now
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+    # Share of frames that were simulated but not drawn
+    def skip_ratio(self):
+        return self.skipped / max(self.frames + self.skipped, 1)
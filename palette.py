@@ -0,0 +1,20 @@
+# Colour palette for array-backed pools.
+# Pools store a small integer per row instead of an RGB tuple, so their
+# colour column can be a plain integer array. index() hands out the next
+# number the first time a colour is seen; colors[i] turns it back.
+
+class Palette:
+    def __init__(self):
+        self.colors = []
+        self.ids = {}  # color -> index in colors
+
+    def __len__(self):
+        return len(self.colors)
+
+    def index(self, color):
+        index = self.ids.get(color)
+        if index is None:
+            index = len(self.colors)
+            self.colors.append(color)
+            self.ids[color] = index
+        return index
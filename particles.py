@@ -0,0 +1,166 @@
+import math
+import random
+
+import pygame
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from palette import Palette
+
+# Explosion and hit debris.
+# Particles live in preallocated arrays (position, velocity, time left and a
+# colour index into a small palette), so a burst is a slice assignment and
+# a frame's update is one pass over the arrays rather than thousands of
+# small objects. The capacity is a hard budget: bursts that don't fit are
+# cut short instead of growing the pool. Particles are drawn straight into
+# the target Surface's pixels, a size x size square each, which skips
+# building a blit per particle. Particles are only decoration, so they use
+# their own random numbers and never touch the game's seeded streams.
+
+MAX_PARTICLES = 20000
+PARTICLE_SIZE = 2
+GRAVITY = 0.0004  # Pixels per ms per ms
+SPEED = (0.03, 0.25)  # Pixels per ms
+LIFETIME = (250.0, 700.0)  # ms
+
+class ParticlePool:
+    def __init__(self, capacity=MAX_PARTICLES, size=PARTICLE_SIZE, seed=None):
+        self.capacity = capacity
+        self.size = size
+        self.count = 0
+        self.palette = Palette()
+        if np is not None:
+            self.rng = np.random.default_rng(seed)
+            self.x = np.zeros(capacity, dtype=np.float32)
+            self.y = np.zeros(capacity, dtype=np.float32)
+            self.vx = np.zeros(capacity, dtype=np.float32)
+            self.vy = np.zeros(capacity, dtype=np.float32)
+            self.life = np.zeros(capacity, dtype=np.float32)
+            self.color = np.zeros(capacity, dtype=np.uint8)
+        else:
+            self.rng = random.Random(seed)
+            self.x = [0.0] * capacity
+            self.y = [0.0] * capacity
+            self.vx = [0.0] * capacity
+            self.vy = [0.0] * capacity
+            self.life = [0.0] * capacity
+            self.color = [0] * capacity
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+
+    # Up to amount particles flying out of (x, y) in every direction
+    def burst(self, x, y, color, amount):
+        start = self.count
+        amount = min(amount, self.capacity - start)
+        if amount <= 0:
+            return
+        end = start + amount
+        color = self.palette.index(color)
+        if np is not None:
+            rng = self.rng
+            angle = rng.uniform(0, 2 * math.pi, amount)
+            speed = rng.uniform(*SPEED, amount)
+            self.x[start:end] = x
+            self.y[start:end] = y
+            self.vx[start:end] = np.cos(angle) * speed
+            self.vy[start:end] = np.sin(angle) * speed
+            self.life[start:end] = rng.uniform(*LIFETIME, amount)
+            self.color[start:end] = color
+        else:
+            rng = self.rng
+            for i in range(start, end):
+                angle = rng.uniform(0, 2 * math.pi)
+                speed = rng.uniform(*SPEED)
+                self.x[i] = x
+                self.y[i] = y
+                self.vx[i] = math.cos(angle) * speed
+                self.vy[i] = math.sin(angle) * speed
+                self.life[i] = rng.uniform(*LIFETIME)
+                self.color[i] = color
+        self.count = end
+
+    # Advance every particle by dt ms and drop the burnt out ones
+    def update(self, dt):
+        n = self.count
+        if not n:
+            return
+        if np is not None:
+            x, y, vy, life = self.x[:n], self.y[:n], self.vy[:n], self.life[:n]
+            x += self.vx[:n] * dt
+            y += vy * dt
+            vy += GRAVITY * dt
+            life -= dt
+            keep = life > 0
+            if not keep.all():
+                left = int(np.count_nonzero(keep))
+                for column in (self.x, self.y, self.vx, self.vy, self.life, self.color):
+                    column[:left] = column[:n][keep]
+                self.count = left
+        else:
+            x, y, vx, vy, life = self.x, self.y, self.vx, self.vy, self.life
+            left = 0
+            for i in range(n):
+                if life[i] <= dt:
+                    continue
+                x[left] = x[i] + vx[i] * dt
+                y[left] = y[i] + vy[i] * dt
+                vx[left] = vx[i]
+                vy[left] = vy[i] + GRAVITY * dt
+                life[left] = life[i] - dt
+                self.color[left] = self.color[i]
+                left += 1
+            self.count = left
+
+    def can_draw(self, surface):
+        return np is not None and surface.get_bitsize() == 32
+
+    # Write every particle into surface's pixels. Returns the Rect around
+    # what was drawn, or None if nothing was. Needs NumPy and a 32-bit
+    # surface (see can_draw()); callers fall back to blitting __iter__.
+    def draw(self, surface):
+        n = self.count
+        if not n:
+            return None
+        size = self.size
+        width, height = surface.get_size()
+        xs = self.x[:n].astype(np.intp)
+        ys = self.y[:n].astype(np.intp)
+        on_screen = (xs >= 0) & (xs <= width - size) & (ys >= 0) & (ys <= height - size)
+        if not on_screen.all():
+            xs, ys = xs[on_screen], ys[on_screen]
+            colors = self.color[:n][on_screen]
+        else:
+            colors = self.color[:n]
+        if not len(xs):
+            return None
+        # map_rgb() comes back signed when the alpha bit is set
+        palette = np.array([surface.map_rgb(color) & 0xFFFFFFFF for color in self.palette.colors], dtype=np.uint32)
+        values = palette[colors]
+        pixels = pygame.surfarray.pixels2d(surface)
+        for dx in range(size):
+            for dy in range(size):
+                pixels[xs + dx, ys + dy] = values
+        del pixels  # Unlocks the surface
+        left, top = int(xs.min()), int(ys.min())
+        return pygame.Rect(left, top, int(xs.max()) - left + size, int(ys.max()) - top + size)
+
+    # (x, y, color) of each particle
+    def __iter__(self):
+        n = self.count
+        xs = self.x[:n]
+        ys = self.y[:n]
+        colors = self.color[:n]
+        if np is not None:
+            xs, ys, colors = xs.astype(np.intp).tolist(), ys.astype(np.intp).tolist(), colors.tolist()
+        else:
+            xs, ys = [int(x) for x in xs], [int(y) for y in ys]
+        palette = self.palette.colors
+        for x, y, c in zip(xs, ys, colors):
+            yield x, y, palette[c]
@@ -0,0 +1,134 @@
+import csv
+from collections import deque
+from time import perf_counter_ns
+
+import pygame
+
+# Per-phase frame timing.
+# The game loop calls begin_frame(), then mark(phase) as each phase ends,
+# then end_frame(). mark() charges the time since the previous mark to that
+# phase, so a phase is whatever ran since the last mark. GameState.step()
+# marks its own phases when it has a monitor attached. The monitor keeps
+# the last `window` frames for rolling averages and worst cases, and can
+# log every frame to a CSV file for offline analysis.
+# PerfOverlay draws the same numbers in game (F3 in the shell).
+
+PHASES = (
+    "events", "input", "expiry", "bullets", "enemies", "formation", "dives",
+    "collisions", "pickups", "snapshot", "draw", "present",
+)
+# Per-frame numbers the shell reports next to the timings. coverage is the
+# share of the screen the renderer had to redraw (1.0 for a full redraw).
+COUNTS = ("enemies", "bullets", "enemy_bullets", "powerups", "skipped", "coverage")
+FRAME_BUDGET_NS = 1_000_000_000 // 60
+
+class PerfMonitor:
+    def __init__(self, window=120, csv_path=None):
+        self.window = window
+        self.phases = {phase: deque(maxlen=window) for phase in PHASES}
+        self.frame_times = deque(maxlen=window)
+        self.frames = 0
+        self.counts = dict.fromkeys(COUNTS, 0)
+        self.current = dict.fromkeys(PHASES, 0)
+        self.frame_start = self.last = perf_counter_ns()
+        self.csv_file = None
+        if csv_path is not None:
+            self.csv_file = open(csv_path, "w", newline="")
+            self.csv = csv.writer(self.csv_file)
+            self.csv.writerow(("frame", "frame_ns") + tuple(f"{phase}_ns" for phase in PHASES) + COUNTS)
+
+    def begin_frame(self):
+        self.frame_start = self.last = perf_counter_ns()
+        self.current = dict.fromkeys(PHASES, 0)
+
+    def mark(self, phase):
+        now = perf_counter_ns()
+        self.current[phase] += now - self.last
+        self.last = now
+
+    # counts: entity counts and the like for this frame, keyed like COUNTS
+    def end_frame(self, **counts):
+        frame_ns = perf_counter_ns() - self.frame_start
+        self.frames += 1
+        self.frame_times.append(frame_ns)
+        current = self.current
+        for phase in PHASES:
+            self.phases[phase].append(current[phase])
+        self.counts.update(counts)
+        if self.csv_file is not None:
+            self.csv.writerow(
+                (self.frames, frame_ns) + tuple(current[phase] for phase in PHASES)
+                + tuple(self.counts[name] for name in COUNTS)
+            )
+
+    # {phase: (average ns, worst ns)} over the last window frames (fewer
+    # until that many have run, all zeros before the first)
+    def stats(self):
+        return {phase: _average_and_worst(times) for phase, times in self.phases.items()}
+
+    def frame_stats(self):
+        return _average_and_worst(self.frame_times)
+
+    def close(self):
+        if self.csv_file is not None:
+            self.csv_file.close()
+            self.csv_file = None
+
+def _average_and_worst(times):
+    if not times:
+        return 0, 0
+    return sum(times) / len(times), max(times)
+
+# Translucent panel with the monitor's numbers and a frame-time graph.
+# Text is only re-rendered every `refresh` frames, which keeps the overlay
+# itself out of the numbers it shows.
+class PerfOverlay:
+    def __init__(self, monitor, font, refresh=10):
+        self.monitor = monitor
+        self.font = font
+        self.refresh = refresh
+        self.line_height = font.get_linesize()
+        self.graph_height = 40
+        width = 230
+        height = self.line_height * (1 + len(PHASES) + len(COUNTS)) + self.graph_height + 12
+        self.panel = pygame.Surface((width, height))
+        self.panel.set_alpha(200)
+        self.rendered_at = None
+
+    def surface(self):
+        frames = self.monitor.frames
+        if self.rendered_at is None or frames - self.rendered_at >= self.refresh:
+            self.rendered_at = frames
+            self._render()
+        return self.panel
+
+    def _render(self):
+        panel = self.panel
+        font = self.font
+        white = (255, 255, 255)
+        panel.fill((20, 20, 20))
+        average, worst = self.monitor.frame_stats()
+        lines = [f"frame   {average / 1e6:6.2f} avg {worst / 1e6:6.2f} max ms"]
+        for phase, (average, worst) in self.monitor.stats().items():
+            lines.append(f"{phase:<10} {average / 1e3:7.0f} {worst / 1e3:7.0f} us")
+        for name, count in self.monitor.counts.items():
+            if isinstance(count, float):
+                lines.append(f"{name:<14} {count:5.0%}")
+            else:
+                lines.append(f"{name:<14} {count:5d}")
+        y = 4
+        for line in lines:
+            panel.blit(font.render(line, True, white), (4, y))
+            y += self.line_height
+
+        # Frame-time graph, newest on the right. The line is the 60 fps budget.
+        top = y + 4
+        bottom = top + self.graph_height
+        scale = self.graph_height / (2 * FRAME_BUDGET_NS)
+        frame_times = self.monitor.frame_times
+        for x, frame_ns in enumerate(frame_times, self.monitor.window - len(frame_times)):
+            height = min(int(frame_ns * scale), self.graph_height)
+            color = (0, 200, 0) if frame_ns <= FRAME_BUDGET_NS else (220, 0, 0)
+            pygame.draw.line(panel, color, (x + 4, bottom), (x + 4, bottom - height))
+        budget_y = bottom - int(FRAME_BUDGET_NS * scale)
+        pygame.draw.line(panel, (200, 200, 0), (4, budget_y), (4 + self.monitor.window, budget_y))
@@ -0,0 +1,100 @@
+import threading
+import time
+
+from game_core import FPS, NO_INPUT, Snapshot
+
+# Optional threaded game loop.
+# A SimulationThread steps the GameState at a fixed rate on its own clock
+# and publishes a Snapshot after every step. The main thread keeps input and
+# drawing (SDL wants those on the main thread): it hands the thread the
+# latest Inputs and draws whatever latest() returns, which is the newest
+# snapshot blended with the one before it by how far we are into the next
+# step. A slow render no longer holds back game time, and a heavy step no
+# longer holds up the screen.
+
+MAX_STEP = 48  # Moves bigger than this in one step are jumps, not smoothed
+MAX_BEHIND = 0.25  # Seconds of backlog the simulation will still catch up on
+
+def _mix(a, b, alpha):
+    if abs(b - a) > MAX_STEP:
+        return b
+    return round(a + (b - a) * alpha)
+
+# (key, x, y, ...) tuples of layer with x and y blended towards them from
+# the same key in previous. New entities are drawn where they are.
+def _blend_layer(previous, layer, alpha):
+    before = {item[0]: item for item in previous}
+    blended = []
+    for item in layer:
+        old = before.get(item[0])
+        if old is not None:
+            item = (item[0], _mix(old[1], item[1], alpha), _mix(old[2], item[2], alpha)) + item[3:]
+        blended.append(item)
+    return tuple(blended)
+
+# Snapshot alpha of the way from previous to latest
+def blend(previous, latest, alpha):
+    if alpha >= 1 or previous is latest:
+        return latest
+    x0, y0, _, _ = previous.player
+    x1, y1, w, h = latest.player
+    return Snapshot(
+        latest.frame, latest.time, latest.score, latest.lives, latest.round_count, latest.game_over,
+        (_mix(x0, x1, alpha), _mix(y0, y1, alpha), w, h), latest.player_alive, latest.invincible,
+        _blend_layer(previous.bullets, latest.bullets, alpha),
+        _blend_layer(previous.enemy_bullets, latest.enemy_bullets, alpha),
+        _blend_layer(previous.enemies, latest.enemies, alpha),
+        _blend_layer(previous.powerups, latest.powerups, alpha),
+        latest.effects,
+    )
+
+class SimulationThread(threading.Thread):
+    def __init__(self, state, rate=FPS):
+        super().__init__(daemon=True)
+        self.state = state
+        self.step_seconds = 1 / rate
+        self.inputs = NO_INPUT  # Set by the main thread
+        self.paused = False
+        self.running = True
+        first = state.snapshot()
+        # Guards frames and read together, so a snapshot is marked read
+        # only if latest() actually handed it out
+        self.lock = threading.Lock()
+        # (previous, latest, when latest was due)
+        self.frames = (first, first, time.perf_counter())
+        self.read = True  # Whether latest() has handed out the newest snapshot
+
+    def run(self):
+        state = self.state
+        due = time.perf_counter()
+        while self.running and not state.game_over:
+            now = time.perf_counter()
+            if now < due:
+                time.sleep(due - now)
+                continue
+            if now - due > MAX_BEHIND:
+                due = now  # Too far behind to catch up, drop the backlog
+            if not self.paused:
+                state.step(self.inputs)
+                snapshot = state.snapshot()
+                with self.lock:
+                    newest = self.frames[1]
+                    if not self.read:
+                        # Never drawn, so its effects would be lost; pass them on
+                        snapshot.effects = newest.effects + snapshot.effects
+                    self.read = False
+                    self.frames = (newest, snapshot, due)
+            due += self.step_seconds
+
+    def stop(self):
+        self.running = False
+
+    # The snapshot to draw right now
+    def latest(self):
+        with self.lock:
+            previous, latest, due = self.frames
+            self.read = True
+        if self.paused:
+            return latest
+        alpha = (time.perf_counter() - due) / self.step_seconds
+        return blend(previous, latest, min(max(alpha, 0.0), 1.0))
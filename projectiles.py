@@ -0,0 +1,136 @@
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from palette import Palette
+
+# Array-backed enemy projectiles.
+# Every bullet is a row in parallel position, velocity and colour arrays.
+# Moving, culling and the player hit test each run once over the whole batch
+# instead of once per bullet. Colours are stored as indexes into a small
+# palette so the colour column stays a plain integer array. Rows are kept in
+# firing order (culling compacts, it never swaps), so the first bullet to hit
+# the player is the same one the old list loop would have found.
+
+class ProjectilePool:
+    def __init__(self, capacity=256, width=4, height=12):
+        self.width = width
+        self.height = height
+        self.count = 0
+        self.palette = Palette()
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        self.capacity = capacity
+        if np is not None:
+            self.x = np.zeros(capacity, dtype=np.int64)
+            self.y = np.zeros(capacity, dtype=np.int64)
+            self.dx = np.zeros(capacity, dtype=np.int64)
+            self.dy = np.zeros(capacity, dtype=np.int64)
+            self.color = np.zeros(capacity, dtype=np.uint8)
+        else:
+            self.x = [0] * capacity
+            self.y = [0] * capacity
+            self.dx = [0] * capacity
+            self.dy = [0] * capacity
+            self.color = [0] * capacity
+
+    def _grow(self):
+        old = (self.x, self.y, self.dx, self.dy, self.color)
+        self._allocate(self.capacity * 2)
+        new = (self.x, self.y, self.dx, self.dy, self.color)
+        for src, dst in zip(old, new):
+            dst[:len(src)] = src
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+
+    def spawn(self, x, y, dx, dy, color):
+        if self.count == self.capacity:
+            self._grow()
+        n = self.count
+        self.x[n] = x
+        self.y[n] = y
+        self.dx[n] = dx
+        self.dy[n] = dy
+        self.color[n] = self.palette.index(color)
+        self.count = n + 1
+
+    # Keep only the rows where keep is true, in the same order
+    def _compact(self, keep):
+        n = self.count
+        if np is not None:
+            left = int(np.count_nonzero(keep))
+            for column in (self.x, self.y, self.dx, self.dy, self.color):
+                column[:left] = column[:n][keep]
+        else:
+            rows = [i for i in range(n) if keep[i]]
+            left = len(rows)
+            for column in (self.x, self.y, self.dx, self.dy, self.color):
+                column[:left] = [column[i] for i in rows]
+        self.count = left
+
+    def remove(self, index):
+        n = self.count
+        for column in (self.x, self.y, self.dx, self.dy, self.color):
+            column[index:n - 1] = column[index + 1:n]
+        self.count = n - 1
+
+    # Move every bullet by its velocity and drop the ones below bottom
+    def update(self, bottom):
+        n = self.count
+        if not n:
+            return
+        if np is not None:
+            x = self.x[:n]
+            y = self.y[:n]
+            x += self.dx[:n]
+            y += self.dy[:n]
+            keep = y <= bottom
+            if not keep.all():
+                self._compact(keep)
+        else:
+            x, y, dx, dy = self.x, self.y, self.dx, self.dy
+            for i in range(n):
+                x[i] += dx[i]
+                y[i] += dy[i]
+            if any(y[i] > bottom for i in range(n)):
+                self._compact([y[i] <= bottom for i in range(n)])
+
+    # Index of the oldest bullet overlapping rect, or None. Same test as
+    # Rect.colliderect()
+    def first_hit(self, rect):
+        n = self.count
+        if not n:
+            return None
+        left, top, width, height = rect
+        right = left + width
+        bottom = top + height
+        if np is not None:
+            x = self.x[:n]
+            y = self.y[:n]
+            hit = (x < right) & (x + self.width > left) & (y < bottom) & (y + self.height > top)
+            index = int(hit.argmax())
+            return index if hit[index] else None
+        for i in range(n):
+            x = self.x[i]
+            y = self.y[i]
+            if x < right and x + self.width > left and y < bottom and y + self.height > top:
+                return i
+        return None
+
+    # (x, y, width, height, color) of each bullet, oldest first
+    def __iter__(self):
+        n = self.count
+        xs = self.x[:n]
+        ys = self.y[:n]
+        colors = self.color[:n]
+        if np is not None:
+            xs, ys, colors = xs.tolist(), ys.tolist(), colors.tolist()
+        palette = self.palette.colors
+        for x, y, color in zip(xs, ys, colors):
+            yield (x, y, self.width, self.height, palette[color])
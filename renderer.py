@@ -0,0 +1,206 @@
+import pygame
+
+from game_core import ENEMY_WIDTH, ENEMY_HEIGHT, SCREEN_WIDTH, SCREEN_HEIGHT
+from hud import Hud
+from particles import ParticlePool
+from sprites import (
+    BULLET_SIZE, ENEMY_BULLET_COLOR, HEALTH_BAR_COLOR, HEALTH_BAR_SIZE, INVINCIBLE_COLOR, WHITE, SpriteCache,
+)
+
+# Draws game frames (game_core.Snapshot) to the screen.
+# With dirty_rects on, the renderer remembers the rect of everything it drew.
+# Next frame it erases only those rects instead of filling the whole screen,
+# and hands last frame's rects plus this frame's to display.update(), so
+# only the parts of the window that changed get pushed out. When the dirty
+# area gets big a plain flip() is cheaper, so it falls back to that.
+# This is the software backend. texture_renderer.py has one that draws
+# through SDL2 textures instead; it reuses draw() and only swaps out the
+# clear/blit/present primitives. The shell only talks to draw(), present(),
+# toggle_fullscreen() and the overlay attribute, and open_renderer() picks
+# the backend.
+# The game always draws to one fixed SCREEN_WIDTH x SCREEN_HEIGHT surface.
+# With scaled on (pygame.SCALED, the shell's default), SDL scales that to
+# the window in a single step when presenting, so going fullscreen is a
+# toggle on the existing window rather than a new set_mode(), and nothing
+# drawn or cached has to be rebuilt. That scale pass presents the whole
+# window every frame, so under SCALED the renderer still erases only the
+# dirty rects but always flips. Unscaled, the window already is the logical
+# size and fullscreen goes through set_mode() at that size.
+# With a background set every pixel changes each frame, so the renderer
+# skips the erase and presents the whole screen.
+
+BLACK = (0, 0, 0)
+FULL_FLIP_COVERAGE = 0.5  # Dirty share of the screen above which we flip instead
+BURSTS = {"kill": 40, "hit": 8, "player": 120}  # Particles per Snapshot.effects kind
+
+class Renderer:
+    def __init__(self, screen, font, dirty_rects=True, scaled=False):
+        self.screen = screen
+        self.font = font
+        self.scaled = scaled  # Display opened with pygame.SCALED
+        self.dirty_rects = dirty_rects
+        self.sprites = SpriteCache()
+        self.sprites.preload()
+        self.hud = Hud(font)
+        self.overlay = None  # Optional perf.PerfOverlay drawn over everything
+        self.background = None  # Optional background.Starfield drawn under everything
+        self.particles = ParticlePool()
+        self.particle_frame = None  # Frame and time the particles were last moved to
+        self.particle_time = None
+        self.drawn = []  # Rects drawn this frame
+        self.previous = []  # Rects drawn last frame
+        self.full_redraw = True
+        self.coverage = 1.0  # Share of the screen redrawn last frame, see present()
+
+    # After set_mode() the new surface starts out blank, so redraw it all
+    def set_screen(self, screen):
+        self.screen = screen
+        self.full_redraw = True
+
+    def toggle_fullscreen(self):
+        try:
+            if self.scaled:
+                pygame.display.toggle_fullscreen()
+                screen = pygame.display.get_surface()
+            elif self.screen.get_flags() & pygame.FULLSCREEN:
+                screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+            else:
+                screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.FULLSCREEN)
+        except pygame.error:
+            return  # No fullscreen on this video driver (e.g. headless)
+        self.set_screen(screen)
+
+    def _blits(self, sequence):
+        drawn = self.screen.blits(sequence, self.dirty_rects)
+        if drawn:
+            self.drawn.extend(drawn)
+
+    def _blit(self, surface, dest):
+        rect = self.screen.blit(surface, dest)
+        if self.dirty_rects:
+            self.drawn.append(rect)
+
+    def clear(self):
+        if self.background is not None:
+            pass  # draw() paints the background over the whole screen
+        elif self.dirty_rects and not self.full_redraw:
+            fill = self.screen.fill
+            for rect in self.previous:
+                fill(BLACK, rect)
+        else:
+            self.screen.fill(BLACK)
+        self.drawn = []
+
+    # Draw a game_core.Snapshot
+    def draw(self, frame, paused=False):
+        self.clear()
+        sprites = self.sprites
+        if self.background is not None:
+            self._blits(self.background.blits(frame.time))
+
+        # Player
+        x, y, w, h = frame.player
+        if frame.player_alive:
+            if frame.invincible:
+                # Blink effect
+                if (int(frame.time) // 300) % 2 == 0:
+                    self._blit(sprites.get(INVINCIBLE_COLOR, (w, h)), (x, y))
+            else:
+                self._blit(sprites.get(WHITE, (w, h)), (x, y))
+
+        # Everything else is drawn one layer at a time, each with a single
+        # blits() call
+        bullet = sprites.get(WHITE, BULLET_SIZE)
+        self._blits([(bullet, (x, y)) for _, x, y in frame.bullets])
+
+        enemy_bullet = sprites.get(ENEMY_BULLET_COLOR, BULLET_SIZE)
+        self._blits([(enemy_bullet, (x, y)) for _, x, y in frame.enemy_bullets])
+
+        enemy_size = (ENEMY_WIDTH, ENEMY_HEIGHT)
+        health_bar = sprites.get(HEALTH_BAR_COLOR, HEALTH_BAR_SIZE)
+        enemy_blits = []
+        bar_blits = []
+        for _, x, y, color, health_ratio in frame.enemies:
+            enemy_blits.append((sprites.get(color, enemy_size), (x, y)))
+            if health_ratio is not None:
+                # Boss health bar, the full bar cropped to the health left
+                bar_blits.append((health_bar, (x, y - 6), pygame.Rect(0, 0, ENEMY_WIDTH * health_ratio, 4)))
+        self._blits(enemy_blits)
+        self._blits(bar_blits)
+
+        self._blits([(sprites.get(color, (w, h)), (x, y)) for _, x, y, w, h, color in frame.powerups])
+
+        self._update_particles(frame)
+        if self.particles:
+            self._draw_particles()
+
+        self._blits(self.hud.blits(frame, paused))
+
+        if self.overlay is not None:
+            self._blit_overlay(self.overlay.surface())
+
+    # Move the particles on to frame's game time and start its bursts. A
+    # frame drawn twice (paused) leaves them where they are.
+    def _update_particles(self, frame):
+        if frame.frame == self.particle_frame:
+            return
+        particles = self.particles
+        if self.particle_time is not None and frame.time > self.particle_time:
+            particles.update(frame.time - self.particle_time)
+        for kind, x, y, color in frame.effects:
+            particles.burst(x, y, color, BURSTS[kind])
+        self.particle_frame = frame.frame
+        self.particle_time = frame.time
+
+    def _draw_particles(self):
+        particles = self.particles
+        if particles.can_draw(self.screen):
+            rect = particles.draw(self.screen)
+            if rect is not None and self.dirty_rects:
+                self.drawn.append(rect)
+        else:
+            size = (particles.size, particles.size)
+            get = self.sprites.get
+            self._blits([(get(color, size), (x, y)) for x, y, color in particles])
+
+    def _blit_overlay(self, panel):
+        self._blit(panel, (SCREEN_WIDTH - panel.get_width() - 10, 40))
+
+    # Show the frame: only the dirty rects when that's worth it, otherwise
+    # the whole screen
+    def present(self):
+        if not self.dirty_rects or self.full_redraw or self.background is not None:
+            # A scrolling background changes every pixel anyway
+            pygame.display.flip()
+            coverage = 1.0
+        else:
+            dirty = self.previous + self.drawn
+            width, height = self.screen.get_size()
+            # Overlapping rects are counted twice, so this errs on the high side
+            coverage = min(sum(rect.w * rect.h for rect in dirty) / (width * height), 1.0)
+            if self.scaled or coverage > FULL_FLIP_COVERAGE:
+                # SCALED presents the whole window whatever we pass
+                pygame.display.flip()
+            else:
+                pygame.display.update(dirty)
+        self.coverage = coverage
+        self.previous = self.drawn
+        self.full_redraw = False
+
+# Open the game window with the named backend ("surface" or "texture").
+# Falls back to the software backend if this pygame has no SDL2 video module.
+# scaled opens the software backend with pygame.SCALED (the texture backend
+# always draws at a fixed logical size).
+def open_renderer(backend, title, font, scaled=False):
+    if backend == "texture":
+        try:
+            from texture_renderer import TextureRenderer
+        except ImportError:
+            pass
+        else:
+            return TextureRenderer(title, font)
+    elif backend != "surface":
+        raise ValueError(f"Unknown render backend: {backend!r}")
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SCALED if scaled else 0)
+    pygame.display.set_caption(title)
+    return Renderer(screen, font, scaled=scaled)
@@ -0,0 +1,160 @@
+# Uniform-grid spatial hash for rect broadphase.
+# Every item (anything with a .rect) lives in the one cell holding its
+# top-left corner. Queries widen their cell range by the largest item seen,
+# so they still find everything that overlaps, and moving an item only ever
+# touches two buckets. Each item also remembers the order it was inserted in.
+# first_hit() uses that to return the same item a plain "for item in items"
+# scan would.
+# For small sets the bookkeeping costs more than it saves. PlainScan below
+# has the same sync()/first_hit()/remove() interface and just scans.
+
+import pygame
+
+class SpatialHash:
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.entries = {}  # item -> (insert order, cell)
+        self.next_order = 0
+        self.max_width = 1
+        self.max_height = 1
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, item):
+        return item in self.entries
+
+    def clear(self):
+        self.cells.clear()
+        self.entries.clear()
+        self.next_order = 0
+
+    def _add(self, item, key):
+        bucket = self.cells.get(key)
+        if bucket is None:
+            # Buckets are dicts so an item can leave a busy cell in O(1)
+            self.cells[key] = {item: None}
+        else:
+            bucket[item] = None
+
+    def _discard(self, item, key):
+        bucket = self.cells[key]
+        del bucket[item]
+        if not bucket:
+            del self.cells[key]
+
+    def _grow(self, rect):
+        if rect.w > self.max_width:
+            self.max_width = rect.w
+        if rect.h > self.max_height:
+            self.max_height = rect.h
+
+    def insert(self, item):
+        rect = item.rect
+        key = (rect.x // self.cell_size, rect.y // self.cell_size)
+        self.entries[item] = (self.next_order, key)
+        self.next_order += 1
+        self._grow(rect)
+        self._add(item, key)
+
+    def remove(self, item):
+        _, key = self.entries.pop(item)
+        self._discard(item, key)
+
+    # Bring the grid up to date with items after they moved. Only items whose
+    # corner crossed into another cell touch the buckets, so a formation
+    # sliding a pixel or two per tick costs one cell check per item.
+    def sync(self, items):
+        entries = self.entries
+        get_entry = entries.get
+        size = self.cell_size
+        for item in items:
+            rect = item.rect
+            key = (rect.x // size, rect.y // size)
+            entry = get_entry(item)
+            if entry is None:
+                entries[item] = (self.next_order, key)
+                self.next_order += 1
+                self._grow(rect)
+                self._add(item, key)
+            elif entry[1] != key:
+                self._discard(item, entry[1])
+                entries[item] = (entry[0], key)
+                self._add(item, key)
+        if len(entries) != len(items):
+            # Something left without being removed, start over in list order
+            self.clear()
+            for item in items:
+                self.insert(item)
+
+    # Cells whose items could overlap rect
+    def cell_range(self, rect):
+        size = self.cell_size
+        return (
+            range((rect.x - self.max_width + 1) // size, (rect.x + rect.w - 1) // size + 1),
+            range((rect.y - self.max_height + 1) // size, (rect.y + rect.h - 1) // size + 1),
+        )
+
+    def query(self, rect):
+        found = []
+        cells = self.cells
+        xs, ys = self.cell_range(rect)
+        for cx in xs:
+            for cy in ys:
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    found.extend(item for item in bucket if rect.colliderect(item.rect))
+        return found
+
+    # The earliest-inserted item whose rect collides with rect, or None
+    def first_hit(self, rect):
+        if not self.entries:
+            return None
+        best = None
+        best_order = None
+        cells = self.cells
+        entries = self.entries
+        size = self.cell_size
+        x, y, w, h = rect
+        top = (y - self.max_height + 1) // size
+        bottom = (y + h - 1) // size + 1
+        for cx in range((x - self.max_width + 1) // size, (x + w - 1) // size + 1):
+            for cy in range(top, bottom):
+                bucket = cells.get((cx, cy))
+                if bucket is None:
+                    continue
+                for item in bucket:
+                    if rect.colliderect(item.rect):
+                        order = entries[item][0]
+                        if best_order is None or order < best_order:
+                            best = item
+                            best_order = order
+        return best
+
+# Broadphase that tests every item, in list order, with one collidelist()
+# call. Cheaper than the grid unless dozens of queries a tick meet thousands
+# of items (see bench_collisions.py). Removed items stay in the list as an
+# empty rect until the next sync().
+NO_RECT = pygame.Rect(0, 0, 0, 0)  # Collides with nothing
+
+class PlainScan:
+    def __init__(self):
+        self.items = []
+        self.rects = []
+
+    def clear(self):
+        self.items = []
+        self.rects = []
+
+    def sync(self, items):
+        self.items = items
+        self.rects = [item.rect for item in items]
+
+    def remove(self, item):
+        self.rects[self.items.index(item)] = NO_RECT
+
+    # The first item in list order whose rect collides with rect, or None
+    def first_hit(self, rect):
+        index = rect.collidelist(self.rects)
+        return None if index < 0 else self.items[index]
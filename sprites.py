@@ -0,0 +1,50 @@
+import pygame
+
+from game_core import (
+    ENEMY_TYPES, POWERUPS,
+    ENEMY_WIDTH, ENEMY_HEIGHT, PLAYER_WIDTH, PLAYER_HEIGHT,
+)
+
+# Pre-rendered sprites for the renderer.
+# Everything on screen is a solid rectangle, so each sprite is a Surface
+# filled once with its colour. Blitting a ready-made Surface is cheaper than
+# having pygame.draw.rect() fill the same rectangle again every frame, and a
+# whole layer of them goes out in one screen.blits() call.
+
+BULLET_SIZE = (5, 15)
+POWERUP_SIZE = (20, 20)
+HEALTH_BAR_SIZE = (ENEMY_WIDTH, 4)
+
+WHITE = (255, 255, 255)
+ENEMY_BULLET_COLOR = (255, 0, 0)
+HEALTH_BAR_COLOR = (0, 255, 0)
+INVINCIBLE_COLOR = (0, 255, 255)
+
+class SpriteCache:
+    def __init__(self):
+        self.surfaces = {}
+
+    # Solid sprite of the given colour and size, made on first use
+    def get(self, color, size):
+        key = (color, size)
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = pygame.Surface(size)
+            if pygame.display.get_surface() is not None:
+                surface = surface.convert()  # Match the screen's pixel format
+            surface.fill(color)
+            self.surfaces[key] = surface
+        return surface
+
+    # Build everything the game draws up front, so the first frames don't
+    # pay for it
+    def preload(self):
+        for color in ENEMY_TYPES.color:
+            self.get(color, (ENEMY_WIDTH, ENEMY_HEIGHT))
+        for kind in POWERUPS.values():
+            self.get(kind["color"], POWERUP_SIZE)
+        self.get(WHITE, BULLET_SIZE)
+        self.get(ENEMY_BULLET_COLOR, BULLET_SIZE)
+        self.get(HEALTH_BAR_COLOR, HEALTH_BAR_SIZE)
+        self.get(WHITE, (PLAYER_WIDTH, PLAYER_HEIGHT))
+        self.get(INVINCIBLE_COLOR, (PLAYER_WIDTH, PLAYER_HEIGHT))
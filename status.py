@@ -0,0 +1,56 @@
+from timers import TimerHeap
+
+# Timed status effects (power-ups, respawn invincibility).
+# Each active effect has a deadline in a TimerHeap on simulation time, so
+# update() only looks at the earliest one and costs nothing on frames where
+# nothing runs out. When an effect runs out its expiry callback fires,
+# exactly once, to undo whatever applying it did. Applying an effect that is
+# already running refreshes it (the clock starts over) or, with
+# stack=True, adds the duration on top of what is left.
+
+class StatusEffects:
+    def __init__(self, now=0):
+        self.timers = TimerHeap(now)
+        self.deadlines = {}
+        self.on_expire = {}  # name -> callback(name)
+
+    def __contains__(self, name):
+        return name in self.deadlines
+
+    def __iter__(self):
+        return iter(self.deadlines)
+
+    def apply(self, name, duration, stack=False):
+        now = self.timers.now
+        deadline = now + duration
+        if stack and name in self.deadlines:
+            deadline = self.deadlines[name] + duration
+        self.deadlines[name] = deadline
+        self.timers.schedule(name, deadline)
+
+    # Game time (ms) name has left, 0 if it isn't active
+    def remaining(self, name):
+        deadline = self.deadlines.get(name)
+        return 0 if deadline is None else max(deadline - self.timers.now, 0)
+
+    # Move the clock to now and expire everything whose deadline has passed
+    def update(self, now):
+        self.timers.advance_to(now)
+        for name in self.timers.pop_due():
+            self._expire(name)
+
+    # End name now, as if it had run out
+    def expire(self, name):
+        if name in self.deadlines:
+            self.timers.cancel(name)
+            self._expire(name)
+
+    def expire_all(self):
+        for name in list(self.deadlines):
+            self.expire(name)
+
+    def _expire(self, name):
+        del self.deadlines[name]
+        callback = self.on_expire.get(name)
+        if callback is not None:
+            callback(name)
@@ -0,0 +1,457 @@
+import os
+import random
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+import pytest
+
+from bullet_pool import BulletPool
+from formation import Formation
+import pacing
+import pipeline
+import projectiles
+from game_core import BEE, ENEMY_WIDTH, POWERUPS, RESPAWN_INVINCIBILITY, Enemy, GameState, Snapshot, sweep_inputs
+from pacing import FramePacer
+from pipeline import MAX_STEP, SimulationThread, blend
+from projectiles import ProjectilePool
+
+# Regression tests for the headless core: seeded games replay exactly, and
+# the faster data structures behave like the plain lists they replaced.
+# Run with: python -m pytest
+
+FRAMES = 3000
+
+# Everything a frame shows, minus the per-object ids (those come from id()
+# and differ between runs)
+def trace(frames=FRAMES, **kwargs):
+    state = GameState(lives=10**6, **kwargs)
+    frames_seen = []
+    for _ in range(frames):
+        state.step(sweep_inputs(state.frame))
+        s = state.snapshot()
+        frames_seen.append((
+            s.frame, s.score, s.lives, s.round_count, s.player, s.player_alive, s.invincible,
+            tuple(e[1:] for e in s.enemies),
+            tuple(b[1:] for b in s.bullets),
+            tuple(b[1:] for b in s.enemy_bullets),
+            tuple(p[1:] for p in s.powerups),
+        ))
+    return frames_seen
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_same_seed_same_game(seed):
+    assert trace(seed=seed) == trace(seed=seed)
+
+def test_seed_changes_game():
+    assert trace(seed=1) != trace(seed=2)
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_grid_matches_plain_scan(seed):
+    assert trace(seed=seed, grid=True) == trace(seed=seed)
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_enemy_store_matches_objects(seed):
+    pytest.importorskip("numpy")
+    from enemy_store import EnemyStore
+    assert trace(seed=seed, store=EnemyStore()) == trace(seed=seed)
+
+# --- BulletPool vs a plain list of Rects ---
+
+@pytest.mark.parametrize("vectorized", [False, True])
+def test_bullet_pool_matches_list(vectorized):
+    if vectorized:
+        pytest.importorskip("numpy")
+    rng = random.Random(1)
+    pool = BulletPool(capacity=32, vectorized=vectorized)
+    bullets = []  # (slot, Rect), oldest first
+    for _ in range(5000):
+        op = rng.random()
+        if op < 0.3:
+            x, y = rng.randint(0, 800), rng.randint(0, 700)
+            pool.spawn(x, y)
+            if len(bullets) == pool.capacity:
+                bullets.pop(0)  # A full pool drops its oldest bullet
+            bullets.append((None, pygame.Rect(x, y, pool.width, pool.height)))
+            # Spawning into a full ring compacts it, which renumbers slots
+            bullets = list(zip(pool.live()[0], (rect for _, rect in bullets)))
+        elif op < 0.45 and bullets:
+            slot, rect = bullets.pop(rng.randrange(len(bullets)))
+            pool.kill(slot)
+        else:
+            speed = rng.randint(1, 40)
+            pool.update(speed)
+            for _, rect in bullets:
+                rect.y -= speed
+            bullets = [(slot, rect) for slot, rect in bullets if rect.bottom >= 0]
+        assert len(pool) == len(bullets)
+        assert list(pool) == [tuple(rect) for _, rect in bullets]
+        assert pool.live()[0] == [slot for slot, _ in bullets]
+
+# --- ProjectilePool vs a plain list of bullets ---
+
+COLORS = ((173, 216, 230), (255, 0, 0), (255, 255, 0))
+
+@pytest.mark.parametrize("vectorized", [False, True])
+def test_projectile_pool_matches_list(monkeypatch, vectorized):
+    if vectorized:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(projectiles, "np", None)
+    rng = random.Random(1)
+    pool = ProjectilePool(capacity=4)  # Small, so it has to grow
+    bullets = []  # [x, y, dx, dy, color], oldest first
+    bottom = 700
+    for _ in range(5000):
+        op = rng.random()
+        if op < 0.3:
+            bullet = [rng.randint(0, 800), rng.randint(0, 700), rng.randint(-3, 3), rng.randint(1, 8), rng.choice(COLORS)]
+            pool.spawn(*bullet)
+            bullets.append(bullet)
+        elif op < 0.5:
+            target = pygame.Rect(rng.randint(0, 760), rng.randint(0, 660), 40, 40)
+            hits = [i for i, (x, y, _, _, _) in enumerate(bullets)
+                    if target.colliderect((x, y, pool.width, pool.height))]
+            index = pool.first_hit(target)
+            assert index == (hits[0] if hits else None)
+            if index is not None:
+                pool.remove(index)
+                del bullets[index]
+        else:
+            pool.update(bottom)
+            for bullet in bullets:
+                bullet[0] += bullet[2]
+                bullet[1] += bullet[3]
+            bullets = [bullet for bullet in bullets if bullet[1] <= bottom]
+        assert len(pool) == len(bullets)
+        assert list(pool) == [(x, y, pool.width, pool.height, color) for x, y, _, _, color in bullets]
+    assert pool.capacity > 4
+
+# --- Formation vs moving every member's rect ---
+
+def test_formation_matches_per_member_moves():
+    rng = random.Random(1)
+    formation = Formation(ENEMY_WIDTH)
+    enemies = []
+    for _ in range(40):
+        e = Enemy(0, 0, rng.randint(0, 700), rng.randint(0, 400), BEE)
+        e.formation = formation
+        e.move_to(*e.original_pos)
+        enemies.append(e)
+    where = {e: e.original_pos for e in enemies}  # Expected position of each enemy
+    for _ in range(3000):
+        e = rng.choice(enemies)
+        op = rng.random()
+        if op < 0.25 and not e.in_formation:
+            e.in_formation = True  # Joins where it stands
+        elif op < 0.4 and e.in_formation:
+            e.in_formation = False
+        elif op < 0.55:
+            x, y = rng.randint(0, 700), rng.randint(0, 400)
+            e.move_to(x, y)
+            where[e] = (x, y)
+            if not e.in_formation:
+                e.original_pos = (x, y)
+        else:
+            dx = rng.choice((-2, -1, 1, 2))
+            formation.shift(dx)
+            for member in formation:
+                x, y = where[member]
+                where[member] = (x + dx, y)
+        members = [member for member in enemies if member.in_formation]
+        assert sorted(map(id, formation)) == sorted(map(id, members))
+        for member in enemies:
+            assert member.rect.topleft == where[member]
+            assert member.original_pos == where[member]
+        if members:
+            lefts = [where[member][0] for member in members]
+            assert formation.bounds() == (min(lefts), max(lefts) + ENEMY_WIDTH)
+
+# --- Status effects ---
+
+SHIELD = POWERUPS["shield"]["duration"]
+
+def test_shield_running_out_keeps_respawn_invincibility():
+    state = GameState()
+    state.activate_powerup("shield")
+    state.status.update(SHIELD - 1000)
+    state.start_respawn_invincibility()
+    state.status.update(SHIELD)
+    assert state.invincible  # Respawn window still running
+    state.status.update(SHIELD - 1000 + RESPAWN_INVINCIBILITY)
+    assert not state.invincible
+
+def test_respawn_running_out_keeps_shield():
+    state = GameState()
+    state.start_respawn_invincibility()
+    state.status.update(1000)
+    state.activate_powerup("shield")
+    state.status.update(RESPAWN_INVINCIBILITY)
+    assert state.invincible  # Shield still running
+    state.status.update(1000 + SHIELD)
+    assert not state.invincible
+
+def test_death_ends_rapid_fire():
+    state = GameState()
+    state.activate_powerup("rapid_fire")
+    assert state.shoot_cooldown == 200
+    state.lose_life()
+    assert state.shoot_cooldown == 500
+    assert "rapid_fire" not in state.status
+    assert state.invincible  # Respawned
+
+# --- WORK.py enemy systems ---
+
+# WORK.py opens its menu when imported, so it is loaded with the benchmark's
+# stand-in tkinter
+@pytest.fixture
+def work(monkeypatch):
+    import importlib.util
+    from pathlib import Path
+    from bench_versions import stub_tkinter
+    for name in ("tkinter", "tkinter.messagebox"):
+        monkeypatch.setitem(sys.modules, name, None)  # Put back after the test
+    stub_tkinter()
+    spec = importlib.util.spec_from_file_location("work", Path(__file__).resolve().parent / "WORK.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def test_asteroid_dies_through_the_systems(work):
+    from ecs import World
+    from timers import TimerHeap
+    world = World(*work.COMPONENTS)
+    timers = TimerHeap()
+    asteroid = work.Asteroid(100, 100)
+    enemies = [asteroid]
+    work.add_enemies(world, enemies)
+    for movement in world["movement"].values():
+        movement.update()
+
+    bullets = [pygame.Rect(asteroid.rect.centerx, asteroid.rect.centery, 5, 15)]
+    assert work.handle_bullet_hits(bullets, enemies, world, timers) == 0
+    assert not bullets and enemies == [asteroid]  # Two hits to kill
+
+    bullets = [pygame.Rect(asteroid.rect.centerx, asteroid.rect.centery, 5, 15)]
+    assert work.handle_bullet_hits(bullets, enemies, world, timers) == asteroid.points
+    assert not enemies
+    assert all(asteroid not in store for store in world.stores.values())
+
+# --- Threaded simulation: blending and effect hand-off ---
+
+def snap(frame, player=(100, 600, 40, 40), enemies=(), effects=()):
+    return Snapshot(frame, frame * 16, 0, 3, 1, False, player, True, False, (), (), enemies, (), effects)
+
+RED = (255, 0, 0)
+
+def test_blend_mixes_matching_keys():
+    previous = snap(1, (100, 600, 40, 40), ((1, 10, 20, RED, None),))
+    latest = snap(2, (120, 580, 40, 40), ((1, 30, 40, RED, None),))
+    assert blend(previous, latest, 1.0) is latest
+    start = blend(previous, latest, 0.0)
+    assert start.player == (100, 600, 40, 40)
+    assert start.enemies == ((1, 10, 20, RED, None),)
+    middle = blend(previous, latest, 0.5)
+    assert middle.frame == 2
+    assert middle.player == (110, 590, 40, 40)
+    assert middle.enemies == ((1, 20, 30, RED, None),)
+
+def test_blend_jumps_big_moves():
+    far = MAX_STEP + 1
+    previous = snap(1, (100, 600, 40, 40), ((1, 10, 20, RED, None),))
+    latest = snap(2, (100 + far, 600, 40, 40), ((1, 10, 20 + far, RED, None),))
+    blended = blend(previous, latest, 0.5)
+    assert blended.player == latest.player
+    assert blended.enemies == latest.enemies
+
+def test_blend_draws_new_keys_where_they_are():
+    previous = snap(1, enemies=((1, 10, 20, RED, None), (2, 50, 50, RED, None)))
+    latest = snap(2, enemies=((1, 30, 40, RED, None), (3, 200, 100, RED, 0.5)), effects=(("kill", 50, 50, RED),))
+    blended = blend(previous, latest, 0.5)
+    assert blended.enemies == ((1, 20, 30, RED, None), (3, 200, 100, RED, 0.5))
+    assert blended.effects == latest.effects
+
+# Stands in for GameState: every step leaves one effect behind.
+# before_step(frame) runs once the snapshot of frame has been published.
+class EffectsState:
+    def __init__(self, steps, before_step=None):
+        self.steps = steps
+        self.before_step = before_step
+        self.frame = 0
+        self.game_over = False
+
+    def step(self, inputs):
+        if self.before_step is not None:
+            self.before_step(self.frame)
+        self.frame += 1
+        self.game_over = self.frame == self.steps
+
+    def snapshot(self):
+        effects = (("hit", self.frame, 0, RED),) if self.frame else ()
+        return snap(self.frame, effects=effects)
+
+# run() on the calling thread, on a clock that only moves when it sleeps
+def run_simulation(monkeypatch, state):
+    clock = [0.0]
+    def sleep(seconds):
+        clock[0] += seconds
+    monkeypatch.setattr(pipeline.time, "perf_counter", lambda: clock[0])
+    monkeypatch.setattr(pipeline.time, "sleep", sleep)
+    simulation = SimulationThread(state)
+    state.simulation = simulation
+    simulation.run()
+    return simulation
+
+def test_unread_snapshots_carry_their_effects(monkeypatch):
+    simulation = run_simulation(monkeypatch, EffectsState(3))
+    previous, latest, _ = simulation.frames
+    assert [effect[1] for effect in latest.effects] == [1, 2, 3]
+    assert simulation.latest().effects == latest.effects
+
+def test_read_snapshots_pass_nothing_on(monkeypatch):
+    def read_second(frame):
+        if frame == 2:
+            assert [effect[1] for effect in state.simulation.latest().effects] == [1, 2]
+    state = EffectsState(4, read_second)
+    simulation = run_simulation(monkeypatch, state)
+    _, latest, _ = simulation.frames
+    # Frames 1 and 2 were handed out, 3 and 4 weren't
+    assert [effect[1] for effect in latest.effects] == [3, 4]
+
+# --- Frame pacing ---
+
+# Fake pygame clock in ms that only moves on sleep() or when a test says so
+class FakeClock:
+    def __init__(self, monkeypatch):
+        self.now = 0.0
+        monkeypatch.setattr(pygame.time, "get_ticks", lambda: int(self.now))
+        monkeypatch.setattr(pacing.time, "sleep", self.sleep)
+
+    def sleep(self, seconds):
+        self.now += seconds * 1000
+
+def test_paused_frames_hold_the_frame_rate(monkeypatch):
+    clock = FakeClock(monkeypatch)
+    pacer = FramePacer()
+    for _ in range(60):
+        clock.now += 5  # Drawing the paused frame
+        pacer.wait()
+    assert clock.now == pytest.approx(1000, abs=1)
+    assert pacer.skipped == pacer.dropped == 0
+
+def test_stall_while_paused_is_not_owed(monkeypatch):
+    clock = FakeClock(monkeypatch)
+    pacer = FramePacer()
+    pacer.wait()
+    clock.now += 200
+    pacer.wait()
+    assert pacer.steps() == 1
+
+def test_overrun_catches_up(monkeypatch):
+    clock = FakeClock(monkeypatch)
+    pacer = FramePacer()
+    assert pacer.steps() == 1
+    clock.now += 40  # Over two steps' worth
+    pacer.wait()
+    assert pacer.steps() == 2
+    assert pacer.skipped == 1
+
+def test_long_stall_drops_past_max_skip(monkeypatch):
+    clock = FakeClock(monkeypatch)
+    pacer = FramePacer(max_skip=5)
+    pacer.steps()
+    clock.now += 1000  # 59 steps due by now
+    pacer.wait()
+    assert pacer.steps() == 6
+    assert pacer.skipped == 5
+    assert pacer.dropped == 53
+    pacer.wait()
+    assert pacer.steps() == 1  # Back on schedule
+
+# --- Timer heap and WORK.py shot cooldowns ---
+
+def test_timer_heap_pops_earliest_first():
+    from timers import TimerHeap
+    timers = TimerHeap()
+    for item, when in (("c", 30), ("a", 10), ("d", 40), ("b", 20)):
+        timers.schedule(item, when)
+    timers.advance(25)
+    assert timers.pop_due() == ["a", "b"]
+    timers.advance(100)
+    assert timers.pop_due() == ["c", "d"]
+    assert not timers.pop_due() and not len(timers)
+
+def test_timer_heap_skips_stale_entries():
+    from timers import TimerHeap
+    timers = TimerHeap()
+    timers.schedule("moved", 10)
+    timers.schedule("cancelled", 20)
+    timers.schedule("moved", 50)  # Leaves its entry at 10 behind
+    timers.cancel("cancelled")  # Leaves its entry at 20 behind
+    timers.advance_to(30)
+    assert timers.pop_due() == []
+    assert "moved" in timers and "cancelled" not in timers
+    timers.advance_to(50)
+    assert timers.pop_due() == ["moved"]
+
+# A red enemy sitting in the formation with its cooldown already up, so
+# only the spawn delay can hold its first shot
+def red_in_formation(work, timers):
+    red = work.RedEnemy(0, 0, 400, 100, 1, timers, pygame.Rect(430, 650, 40, 40))
+    red.shooter.last_shot_time = timers.now - red.shooter.cooldown
+    red.in_formation = True
+    return red
+
+def test_red_enemy_holds_fire_until_attack_delay(work, monkeypatch):
+    from projectiles import ProjectilePool
+    from timers import TimerHeap
+    monkeypatch.setattr(work, "random", random.Random(1))
+    timers = TimerHeap(1000)
+    red = red_in_formation(work, timers)
+    ready = red.spawn_time + red.attack_delay
+    assert red.attack_delay > 0
+    bullets = ProjectilePool()
+    shooters = {red: red.shooter}
+    while timers.now < ready:
+        work.handle_enemy_shooting(timers, shooters, bullets)
+        assert not bullets
+        timers.advance(16)
+    work.handle_enemy_shooting(timers, shooters, bullets)
+    assert len(bullets) == 1
+
+def test_killed_enemy_never_fires(work, monkeypatch):
+    from ecs import World
+    from projectiles import ProjectilePool
+    from timers import TimerHeap
+    monkeypatch.setattr(work, "random", random.Random(1))
+    timers = TimerHeap()
+    world = World(*work.COMPONENTS)
+    red = red_in_formation(work, timers)
+    enemies = [red]
+    work.add_enemies(world, enemies)
+    assert red in timers
+    shots = [pygame.Rect(red.rect.x, red.rect.y, 5, 15)]
+    work.handle_bullet_hits(shots, enemies, world, timers)
+    assert not enemies and red not in timers
+    bullets = ProjectilePool()
+    timers.advance(60000)
+    work.handle_enemy_shooting(timers, {red: red.shooter}, bullets)
+    assert not bullets
+
+# --- Perf monitor ---
+
+def test_perf_averages_only_frames_seen(monkeypatch):
+    import perf
+    clock = iter(range(0, 10**9, 1000))
+    monkeypatch.setattr(perf, "perf_counter_ns", lambda: next(clock))
+    monitor = perf.PerfMonitor(window=120)
+    assert monitor.frame_stats() == (0, 0)
+    for _ in range(3):
+        monitor.begin_frame()
+        monitor.mark("draw")
+        monitor.end_frame()
+    # Every mark is 1000 ns after the one before
+    assert monitor.frame_stats() == (2000, 2000)
+    assert monitor.stats()["draw"] == (1000, 1000)
+    assert monitor.stats()["present"] == (0, 0)
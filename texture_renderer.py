@@ -0,0 +1,112 @@
+import weakref
+
+import pygame
+from pygame._sdl2 import video
+
+from game_core import SCREEN_WIDTH, SCREEN_HEIGHT
+from renderer import BLACK, Renderer
+
+# Hardware render backend.
+# Draws through pygame._sdl2's Renderer, so blits happen on the GPU rather
+# than in software onto the display Surface. Every Surface the software
+# backend would blit (sprites, HUD glyphs, the perf overlay) is uploaded
+# once as a Texture and drawn from there. The sprites are all uploaded up
+# front. Textures are cached per Surface and go away with it, so HUD text
+# that gets re-rendered doesn't pile up stale textures.
+# The whole screen is redrawn every frame; the GPU doesn't care about dirty
+# rects. With SDL_RENDER_DRIVER=software (and SDL_VIDEODRIVER=dummy) it
+# runs headless on SDL's software renderer.
+
+SDL_BLENDMODE_BLEND = 1
+
+class TextureRenderer(Renderer):
+    def __init__(self, title, font, vsync=False):
+        self.window = video.Window(title, (SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.fullscreen = False
+        self.gpu = video.Renderer(self.window, vsync=vsync)
+        # Draw in game coordinates whatever size the window ends up
+        self.gpu.logical_size = (SCREEN_WIDTH, SCREEN_HEIGHT)
+        self.textures = weakref.WeakKeyDictionary()
+        self.overlay_texture = None
+        self.overlay_panel = None
+        self.overlay_rendered_at = None
+        # Particles are drawn into this transparent layer's pixels and the
+        # layer goes up as one texture, a rect at a time
+        self.particle_layer = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+        self.particle_texture = video.Texture(self.gpu, (SCREEN_WIDTH, SCREEN_HEIGHT), streaming=True)
+        self.particle_texture.blend_mode = SDL_BLENDMODE_BLEND
+        self.particle_rect = None
+        super().__init__(None, font, dirty_rects=False)
+        for surface in self.sprites.surfaces.values():
+            self._texture(surface)
+
+    def _texture(self, surface):
+        texture = self.textures.get(surface)
+        if texture is None:
+            texture = video.Texture.from_surface(self.gpu, surface)
+            self.textures[surface] = texture
+        return texture
+
+    def set_screen(self, screen):
+        pass  # There is no display Surface, the window is ours
+
+    def toggle_fullscreen(self):
+        if self.fullscreen:
+            self.window.set_windowed()
+        else:
+            self.window.set_fullscreen(desktop=True)
+        self.fullscreen = not self.fullscreen
+
+    def clear(self):
+        self.gpu.draw_color = (*BLACK, 255)
+        self.gpu.clear()
+
+    # blits() items are (surface, dest) or (surface, dest, area)
+    def _blits(self, sequence):
+        texture_for = self._texture
+        for item in sequence:
+            texture = texture_for(item[0])
+            x, y = item[1]
+            if len(item) > 2:
+                area = item[2]
+                texture.draw(srcrect=area, dstrect=(x, y, area.w, area.h))
+            else:
+                texture.draw(dstrect=(x, y, texture.width, texture.height))
+
+    def _blit(self, surface, dest):
+        self._blits(((surface, dest),))
+
+    def _draw_particles(self):
+        particles = self.particles
+        layer = self.particle_layer
+        if not particles.can_draw(layer):
+            super()._draw_particles()
+            return
+        previous = self.particle_rect
+        if previous is not None:
+            layer.fill((0, 0, 0, 0), previous)
+        self.particle_rect = rect = particles.draw(layer)
+        # Only the pixels the particles left or moved into have changed, so
+        # only that part of the layer goes up
+        if previous is not None:
+            rect = previous if rect is None else rect.union(previous)
+        if rect is not None:
+            self.particle_texture.update(layer.subsurface(rect), rect)
+        self.particle_texture.draw()
+
+    # The overlay re-renders into the same Surface, so its texture is
+    # refreshed whenever the overlay has drawn new numbers
+    def _blit_overlay(self, panel):
+        if panel is not self.overlay_panel:
+            self.overlay_panel = panel
+            self.overlay_texture = video.Texture.from_surface(self.gpu, panel)
+            self.overlay_texture.blend_mode = SDL_BLENDMODE_BLEND
+            self.overlay_texture.alpha = panel.get_alpha()
+        elif self.overlay.rendered_at != self.overlay_rendered_at:
+            self.overlay_texture.update(panel)
+        self.overlay_rendered_at = self.overlay.rendered_at
+        x = SCREEN_WIDTH - panel.get_width() - 10
+        self.overlay_texture.draw(dstrect=(x, 40, panel.get_width(), panel.get_height()))
+
+    def present(self):
+        self.gpu.present()
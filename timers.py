@@ -0,0 +1,57 @@
+import heapq
+from itertools import count
+
+# Min-heap of timers on game time.
+# Items are scheduled for a time and come back out of pop_due() once the
+# clock has reached it, earliest first, so a frame only touches the timers
+# that actually went off instead of asking every item whether it is ready.
+# The clock only moves when advance() or advance_to() is called, so timers
+# stop with the game loop. Rescheduling or cancelling an item leaves its old heap entry
+# behind; each item's current entry is tracked and stale ones are skipped
+# when they reach the top.
+
+class TimerHeap:
+    def __init__(self, now=0):
+        self.now = now
+        self.heap = []
+        self.current = {}  # item -> sequence number of its live entry
+        self.sequence = count()
+
+    def __len__(self):
+        return len(self.current)
+
+    def __contains__(self, item):
+        return item in self.current
+
+    def advance(self, dt):
+        self.now += dt
+
+    # Set the clock to game time now, for owners that keep their own
+    def advance_to(self, now):
+        self.now = now
+
+    # Wake item at game time when (replacing any earlier schedule)
+    def schedule(self, item, when):
+        seq = next(self.sequence)
+        self.current[item] = seq
+        heapq.heappush(self.heap, (when, seq, item))
+
+    def cancel(self, item):
+        self.current.pop(item, None)
+
+    def clear(self):
+        self.heap.clear()
+        self.current.clear()
+
+    # Items whose time has come, earliest first. Each is unscheduled as it
+    # comes out.
+    def pop_due(self):
+        heap = self.heap
+        current = self.current
+        due = []
+        while heap and heap[0][0] <= self.now:
+            _, seq, item = heapq.heappop(heap)
+            if current.get(item) == seq:
+                del current[item]
+                due.append(item)
+        return due